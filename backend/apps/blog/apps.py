@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.blog'
+
+    def ready(self):
+        import apps.blog.events  # noqa: F401  (connects the post signal handlers)
+        import apps.blog.counts  # noqa: F401
+        import apps.blog.stats  # noqa: F401
+        import apps.blog.search  # noqa: F401
@@ -0,0 +1,125 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from functools import reduce
+from operator import or_
+
+from django.db.models import Count, DateField, F, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from apps.blog.models import ArchiveScope, Post, PostArchiveCount, PostCategory
+
+
+def month_range(year, month=None):
+    """
+        Return the aware [start, end) datetimes of a month, or of a whole year without a month.
+        Raises ValueError when the year or month is out of range.
+    """
+    if month is None:
+        start, end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    else:
+        start, end = datetime(year, month, 1), datetime(year + month // 12, month % 12 + 1, 1)
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def post_month():
+    return TruncMonth('created_at', output_field=DateField())
+
+
+def archive_counts(posts):
+    """
+        Count the given posts per (scope, scope id, month) archive bucket, with grouped queries.
+    """
+    counts = Counter()
+
+    for row in posts.annotate(month=post_month()).values('month').annotate(total=Count('id')).order_by():
+        counts[(ArchiveScope.ALL, 0, row['month'])] += row['total']
+
+    for row in posts.annotate(month=post_month()).values('author_id', 'month').annotate(total=Count('id')).order_by():
+        counts[(ArchiveScope.AUTHOR, row['author_id'], row['month'])] += row['total']
+
+    counts.update(category_archive_counts(posts))
+    return counts
+
+
+def category_archive_counts(posts):
+    """
+        Count the given posts per category and month. A post filed twice under a category counts once.
+    """
+    rows = PostCategory.objects.filter(post__in=posts).values('category_id').annotate(
+        month=TruncMonth('post__created_at', output_field=DateField()),
+        total=Count('post_id', distinct=True)
+    ).values_list('category_id', 'month', 'total').order_by()
+
+    return Counter({(ArchiveScope.CATEGORY, category_id, month): total for category_id, month, total in rows})
+
+
+def apply_archive_deltas(deltas):
+    """
+        Add signed deltas to archive buckets, given a {(scope, scope id, month): delta} mapping.
+        Missing buckets are created first; buckets sharing the same delta are updated with a single query.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    PostArchiveCount.objects.bulk_create([
+        PostArchiveCount(scope=scope, scope_id=scope_id, month=month)
+        for scope, scope_id, month in deltas
+    ], ignore_conflicts=True)
+
+    keys_by_delta = defaultdict(list)
+    for key, delta in deltas.items():
+        keys_by_delta[delta].append(key)
+
+    for delta, keys in keys_by_delta.items():
+        condition = reduce(or_, (Q(scope=scope, scope_id=scope_id, month=month) for scope, scope_id, month in keys))
+        PostArchiveCount.objects.filter(condition).update(post_count=F('post_count') + delta)
+
+
+def add_posts_to_archive(posts):
+    """
+        Count posts that just became visible, once their categories are written.
+    """
+    apply_archive_deltas(archive_counts(posts))
+
+
+def remove_posts_from_archive(posts):
+    """
+        Uncount posts about to be hidden, while their categories are still readable.
+    """
+    apply_archive_deltas({key: -total for key, total in archive_counts(posts).items()})
+
+
+@contextmanager
+def track_archive_categories(posts):
+    """
+        Move the posts between category buckets according to the category changes made inside the block.
+    """
+    before = category_archive_counts(posts)
+    yield
+    after = category_archive_counts(posts)
+    apply_archive_deltas({key: after[key] - before[key] for key in before.keys() | after.keys()})
+
+
+def get_archive(scope=ArchiveScope.ALL, scope_id=0):
+    """
+        Return the non-empty months of an archive, newest first, as {year, month, count} rows.
+    """
+    buckets = PostArchiveCount.objects.filter(scope=scope, scope_id=scope_id, post_count__gt=0).order_by('-month')
+    return [
+        {'year': month.year, 'month': month.month, 'count': post_count}
+        for month, post_count in buckets.values_list('month', 'post_count')
+    ]
+
+
+def rebuild_archive():
+    """
+        Recompute every archive bucket from the visible posts.
+    """
+    PostArchiveCount.objects.all().delete()
+    PostArchiveCount.objects.bulk_create([
+        PostArchiveCount(scope=scope, scope_id=scope_id, month=month, post_count=total)
+        for (scope, scope_id, month), total in archive_counts(Post.objects.all()).items()
+    ], batch_size=1000)
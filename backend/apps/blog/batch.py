@@ -0,0 +1,86 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.blog.models import Post, PostCategory
+from apps.blog.utils import add_posts_tags, remove_posts_tags
+from apps.blog.events import publish_post_events_on_commit
+from apps.blog.counts import invalidate_post_counts
+from apps.blog.stats import invalidate_author_stats
+from apps.blog.search import invalidate_search_results
+from apps.blog.archive import track_archive_categories
+from apps.blog.jobs import schedule_posts_deletion
+
+
+def check_ownership(user, post_ids):
+    """
+        Split post ids into the ones owned by the user and a per-id result for the others, with a single query.
+    """
+    authors = dict(Post.objects.filter(id__in=post_ids).values_list('id', 'author_id'))
+
+    owned = [post_id for post_id in post_ids if authors.get(post_id) == user.id]
+    results = {
+        post_id: 'not_found' if post_id not in authors else 'forbidden'
+        for post_id in post_ids if authors.get(post_id) != user.id
+    }
+    return owned, results
+
+
+class BatchOwnershipError(Exception):
+    """
+        Raised when a batch names posts of other users; nothing is changed then.
+        `results` holds the result of each requested id, 'skipped' for the user's own posts.
+    """
+
+    def __init__(self, results):
+        super().__init__("Some posts belong to other users")
+        self.results = results
+
+
+@transaction.atomic
+def run_batch_operation(user, data):
+    """
+        Apply one action to every post of the batch owned by the user, as set-based queries in one transaction.
+        Returns the result of each requested id: updated, deleted or not_found. A batch naming another user's
+        post is rejected as a whole with BatchOwnershipError.
+    """
+    owned, results = check_ownership(user, data['ids'])
+    action = data['action']
+
+    if 'forbidden' in results.values():
+        raise BatchOwnershipError([{'id': post_id, 'result': results.get(post_id, 'skipped')} for post_id in data['ids']])
+
+    if owned:
+        # update() and relation changes skip auto_now, bump it so the change feed picks the posts up,
+        # and bump the version so pending optimistic edits of these posts are rejected.
+        Post.objects.filter(id__in=owned).update(updated_at=timezone.now(), version=F('version') + 1)
+
+    if owned and action == 'delete':
+        schedule_posts_deletion(owned, requested_by=user)
+        results.update({post_id: 'deleted' for post_id in owned})
+
+    elif owned:
+        if action == 'set_status':
+            Post.objects.filter(id__in=owned).update(status=data['status'])
+
+        elif action == 'set_categories':
+            with track_archive_categories(Post.objects.filter(id__in=owned)):
+                PostCategory.objects.filter(post_id__in=owned).delete()
+                PostCategory.objects.bulk_create([
+                    PostCategory(post_id=post_id, category_id=category_id)
+                    for post_id in owned for category_id in dict.fromkeys(data['category_ids'])
+                ])
+
+        elif action == 'add_tags':
+            add_posts_tags(owned, data['tags'])
+
+        elif action == 'remove_tags':
+            remove_posts_tags(owned, data['tags'])
+
+        publish_post_events_on_commit('updated', owned)
+        invalidate_post_counts()
+        invalidate_author_stats([user.id])
+        invalidate_search_results()
+        results.update({post_id: 'updated' for post_id in owned})
+
+    return [{'id': post_id, 'result': results[post_id]} for post_id in data['ids']]
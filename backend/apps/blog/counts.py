@@ -0,0 +1,72 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.blog.models import Post
+
+
+GENERATION_KEY = 'post_counts:generation'
+
+
+def get_generation():
+    return cache.get_or_set(GENERATION_KEY, 1, None)
+
+
+def invalidate_post_counts():
+    """
+        Make every cached post count stale, once the current transaction commits.
+        Called by every write that can change which posts a list returns.
+    """
+    def bump():
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.set(GENERATION_KEY, 1, None)
+
+    transaction.on_commit(bump)
+
+
+def get_cached_count(queryset):
+    """
+        Return the exact number of rows of a queryset, cached for POST_COUNT_CACHE_TIMEOUT seconds
+        under its SQL and the current generation, so repeated pages of a list count it once.
+    """
+    sql = str(queryset.order_by().query)
+    key = f'post_counts:{get_generation()}:{hashlib.sha256(sql.encode()).hexdigest()}'
+
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, getattr(settings, 'POST_COUNT_CACHE_TIMEOUT', 30))
+    return count
+
+
+def estimate_count(model):
+    """
+        Return the planner's estimate of the number of rows of a model's table, from the PostgreSQL statistics,
+        or None on other databases and below POST_COUNT_ESTIMATE_THRESHOLD rows, where counting exactly is cheap.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        # A partitioned table has no statistics of its own: its estimate is the sum of its partitions'.
+        cursor.execute(
+            "SELECT CASE WHEN c.relkind = 'p' THEN (SELECT coalesce(sum(greatest(p.reltuples, 0)), 0) FROM pg_inherits i "
+            "JOIN pg_class p ON p.oid = i.inhrelid WHERE i.inhparent = c.oid) ELSE c.reltuples END::bigint "
+            "FROM pg_class c WHERE c.oid = %s::regclass", [model._meta.db_table]
+        )
+        row = cursor.fetchone()
+
+    if row is None or row[0] < getattr(settings, 'POST_COUNT_ESTIMATE_THRESHOLD', 100000):
+        return None
+    return row[0]
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    invalidate_post_counts()
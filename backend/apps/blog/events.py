@@ -0,0 +1,137 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.blog.models import Post, PostCategory
+
+
+SUBSCRIBER_QUEUE_SIZE = 100
+PUBLISH_BATCH_SIZE = 1000
+
+
+class Subscriber:
+    """
+        A connected client, with the asyncio queue its stream reads from and its author/category filters.
+    """
+
+    def __init__(self, loop, authors=None, categories=None):
+        self.loop = loop
+        self.queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.authors = set(authors or [])
+        self.categories = set(categories or [])
+        self.dropped = 0
+
+    def matches(self, event):
+        if self.authors and event['author_id'] not in self.authors:
+            return False
+        if self.categories and not self.categories.intersection(event['category_ids']):
+            return False
+        return True
+
+    def deliver(self, event):
+        """
+            Queue an event, on the subscriber's event loop. A client too slow to drain its queue loses events.
+        """
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+
+class PostEventBroadcaster:
+    """
+        In-process fan-out of post events to the connected subscribers.
+        Events are published from request threads and handed to each subscriber's event loop,
+        so a subscriber costs a queue, not a thread. Only the clients connected to this process receive them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._ids = itertools.count(1)
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def subscribe(self, loop, authors=None, categories=None):
+        subscriber = Subscriber(loop, authors, categories)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event):
+        with self._lock:
+            event = {'id': next(self._ids), **event}
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            if not subscriber.matches(event):
+                continue
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+            except RuntimeError:
+                self.unsubscribe(subscriber)
+
+
+broadcaster = PostEventBroadcaster()
+
+
+def publish_post_events(event_type, post_ids):
+    """
+        Publish a created/updated/deleted event for each post, with the author and category ids filters match on.
+        Does nothing, not even a query, while nobody is listening.
+    """
+    if not broadcaster.has_subscribers():
+        return
+
+    for start in range(0, len(post_ids), PUBLISH_BATCH_SIZE):
+        publish_post_events_batch(event_type, post_ids[start:start + PUBLISH_BATCH_SIZE])
+
+
+def publish_post_events_batch(event_type, post_ids):
+    category_ids = defaultdict(list)
+    for post_id, category_id in PostCategory.objects.filter(post_id__in=post_ids).values_list('post_id', 'category_id'):
+        category_ids[post_id].append(category_id)
+
+    posts = Post.all_objects.filter(id__in=post_ids).values_list('id', 'title', 'status', 'author_id', 'updated_at')
+    for post_id, title, post_status, author_id, updated_at in posts:
+        broadcaster.publish({
+            'type': event_type,
+            'post_id': post_id,
+            'title': title,
+            'status': post_status,
+            'author_id': author_id,
+            'category_ids': category_ids[post_id],
+            'updated_at': updated_at,
+        })
+
+
+def publish_post_events_on_commit(event_type, post_ids):
+    """
+        Publish post events once the current transaction commits, when tags and categories are written too.
+    """
+    if broadcaster.has_subscribers():
+        transaction.on_commit(lambda: publish_post_events(event_type, post_ids))
+
+
+def format_event(event):
+    """
+        Format an event as a Server-Sent Events message.
+    """
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, cls=DjangoJSONEncoder)}\n\n"
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    publish_post_events_on_commit('created' if created else 'updated', [instance.id])
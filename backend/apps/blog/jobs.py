@@ -0,0 +1,145 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.blog.models import Post, PostTombstone, DeletionJob, DeletionJobStatus, DeletionTarget
+from apps.blog.utils import release_post_tags
+from apps.blog.events import publish_post_events_on_commit
+from apps.blog.counts import invalidate_post_counts
+from apps.blog.stats import invalidate_author_stats
+from apps.blog.search import invalidate_search_results
+from apps.blog.archive import remove_posts_from_archive
+from apps.users.models import User
+
+
+# A running job whose progress has not moved for this long is considered abandoned by a crashed runner.
+STALE_JOB_TIMEOUT = timedelta(minutes=5)
+
+
+def record_tombstones(posts):
+    """
+        Record a tombstone for every given post, so the change feed reports their deletion,
+        publish their deletion to the event stream subscribers and drop the cached post counts, author statistics and search results.
+    """
+    deleted_at = timezone.now()
+    tombstones = [
+        PostTombstone(post_id=post_id, author_id=author_id, deleted_at=deleted_at)
+        for post_id, author_id in posts.values_list('id', 'author_id').iterator()
+    ]
+    PostTombstone.objects.bulk_create(tombstones, batch_size=1000)
+    publish_post_events_on_commit('deleted', [tombstone.post_id for tombstone in tombstones])
+    invalidate_post_counts()
+    invalidate_author_stats([tombstone.author_id for tombstone in tombstones])
+    invalidate_search_results()
+
+
+@transaction.atomic
+def schedule_user_deletion(user, requested_by=None):
+    """
+        Hide a user and their posts from reads right away and queue the purge of their data.
+    """
+    User.all_objects.filter(id=user.id).update(pending_deletion=True)
+    remove_posts_from_archive(Post.objects.filter(author_id=user.id))
+    record_tombstones(Post.objects.filter(author_id=user.id))
+    total_posts = Post.all_objects.filter(author_id=user.id).update(pending_deletion=True)
+
+    return DeletionJob.objects.create(target_type=DeletionTarget.USER, target_id=user.id, total_posts=total_posts, requested_by=requested_by)
+
+
+def schedule_post_deletion(post, requested_by=None):
+    """
+        Hide a post from reads right away and queue its purge.
+    """
+    return schedule_posts_deletion([post.id], requested_by)[0]
+
+
+@transaction.atomic
+def schedule_posts_deletion(post_ids, requested_by=None):
+    """
+        Hide posts from reads right away and queue one purge job per post, with a constant number of queries.
+    """
+    remove_posts_from_archive(Post.objects.filter(id__in=post_ids))
+    record_tombstones(Post.objects.filter(id__in=post_ids))
+    Post.all_objects.filter(id__in=post_ids).update(pending_deletion=True)
+
+    return DeletionJob.objects.bulk_create([
+        DeletionJob(target_type=DeletionTarget.POST, target_id=post_id, total_posts=1, requested_by=requested_by)
+        for post_id in post_ids
+    ])
+
+
+def claim_next_job():
+    """
+        Mark the oldest pending (or abandoned) job as running and return it, or None when the queue is empty.
+        Concurrent runners skip rows locked by each other.
+    """
+    stale_before = timezone.now() - STALE_JOB_TIMEOUT
+
+    with transaction.atomic():
+        job = DeletionJob.objects.select_for_update(skip_locked=True).filter(
+            Q(status=DeletionJobStatus.PENDING) |
+            Q(status=DeletionJobStatus.RUNNING, updated_at__lt=stale_before)
+        ).order_by('id').first()
+
+        if job:
+            job.status = DeletionJobStatus.RUNNING
+            job.save(update_fields=['status', 'updated_at'])
+
+    return job
+
+
+def purge_posts(post_ids):
+    """
+        Delete posts by id. On PostgreSQL their tags and categories are deleted with one statement each,
+        so no dependent row is loaded into Python. This does not rely on the foreign keys cascading:
+        a later migration may recreate them without the cascade, and a partitioned posts table has none.
+    """
+    release_post_tags(post_ids)
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM post_tags WHERE post_id = ANY(%s)', [list(post_ids)])
+            cursor.execute('DELETE FROM post_categories WHERE post_id = ANY(%s)', [list(post_ids)])
+            cursor.execute('DELETE FROM posts WHERE id = ANY(%s)', [list(post_ids)])
+    else:
+        Post.all_objects.filter(id__in=post_ids).delete()
+
+
+def run_job(job, batch_size=None):
+    """
+        Purge the posts of a job in bounded batches, each in its own short transaction, then delete the target.
+    """
+    batch_size = batch_size or getattr(settings, 'DELETION_JOB_BATCH_SIZE', 500)
+
+    if job.target_type == DeletionTarget.USER:
+        posts = Post.all_objects.filter(author_id=job.target_id, pending_deletion=True)
+    else:
+        posts = Post.all_objects.filter(id=job.target_id, pending_deletion=True)
+
+    try:
+        while True:
+            post_ids = list(posts.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not post_ids:
+                break
+
+            with transaction.atomic():
+                purge_posts(post_ids)
+                job.deleted_posts += len(post_ids)
+                job.save(update_fields=['deleted_posts', 'updated_at'])
+
+        if job.target_type == DeletionTarget.USER:
+            with transaction.atomic():
+                User.all_objects.filter(id=job.target_id, pending_deletion=True).delete()
+
+        job.status = DeletionJobStatus.DONE
+
+    except Exception as e:
+        job.status = DeletionJobStatus.FAILED
+        job.error = str(e)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+    return job
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.models import Post
+from apps.blog.utils import build_content_metadata
+
+
+class Command(BaseCommand):
+    help = "Compute the excerpt, word count, content length and reading time of existing posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Number of posts updated per query")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fields = ['excerpt', 'word_count', 'content_length', 'reading_time']
+        batch = []
+        updated = 0
+
+        for post in Post.objects.only('id', 'content').order_by('id').iterator(chunk_size=batch_size):
+            for field, value in build_content_metadata(post.content).items():
+                setattr(post, field, value)
+            batch.append(post)
+
+            if len(batch) >= batch_size:
+                Post.objects.bulk_update(batch, fields)
+                updated += len(batch)
+                batch = []
+
+        if batch:
+            Post.objects.bulk_update(batch, fields)
+            updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Updated content metadata of {updated} posts"))
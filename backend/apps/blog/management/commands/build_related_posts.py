@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.related import build_related_posts
+
+
+class Command(BaseCommand):
+    help = ("Compute the related posts of each post from their shared tags and categories (requires NumPy and SciPy). "
+            "Only the posts affected by changes since the last run are recomputed, unless --full is given.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recompute the related posts of every post")
+
+    def handle(self, *args, **options):
+        recomputed = build_related_posts(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f"Recomputed the related posts of {recomputed} posts"))
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.schema import generate_schema, render_schema_file
+
+
+class Command(BaseCommand):
+    help = ("Write the OpenAPI schema served at /schema/ to OPENAPI_SCHEMA_FILE, "
+            "or with --check, fail when the committed file no longer matches the code.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help="Compare the file with the code instead of writing it")
+
+    def handle(self, *args, **options):
+        path = settings.OPENAPI_SCHEMA_FILE
+        content = render_schema_file(generate_schema())
+
+        if options['check']:
+            if not path.exists() or path.read_bytes() != content:
+                raise CommandError(f"{path} is stale, run `python manage.py generate_schema` and commit it")
+            self.stdout.write(self.style.SUCCESS(f"{path} is up to date"))
+            return
+
+        path.write_bytes(content)
+        self.stdout.write(self.style.SUCCESS(f"Wrote the OpenAPI schema to {path}"))
@@ -0,0 +1,108 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.blog.partitions import (
+    TABLE, UNPARTITIONED_TABLE, PartitioningError, convert_to_partitioned, explain_partitions, get_partitioning_settings,
+    is_partitioned, list_partitions, maintain_partitions,
+)
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = ("Range partition the posts table by month of created_at on PostgreSQL, and manage its partitions. "
+            "'convert' turns the current table into a partitioned one, 'maintain' creates the partitions of the "
+            "coming months and detaches the old ones (schedule it, e.g. daily), 'status' lists the partitions and "
+            "'explain' requests list paths and shows which partitions their queries read.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['convert', 'maintain', 'status', 'explain'])
+        parser.add_argument('paths', nargs='*', help="Paths to request with 'explain' (default: the post lists of this month)")
+        parser.add_argument('--months-ahead', type=int, help="Months after the current one to create partitions for")
+        parser.add_argument('--detach-after-months', type=int, help="Detach the partitions older than this many months")
+        parser.add_argument('--keep-unpartitioned', action='store_true',
+                            help=f"With 'convert', keep the original table as {UNPARTITIONED_TABLE}")
+        parser.add_argument('--user', help="Username the 'explain' requests are authenticated as (default: the first admin)")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Partitioning needs PostgreSQL")
+
+        try:
+            getattr(self, options['action'])(options)
+        except PartitioningError as e:
+            raise CommandError(str(e))
+
+    def convert(self, options):
+        created = convert_to_partitioned(options['months_ahead'], options['keep_unpartitioned'])
+        self.stdout.write(self.style.SUCCESS(f"Partitioned {TABLE} into {len(created)} monthly partitions ({created[0]} to {created[-1]})"))
+        self.stdout.write("The foreign keys from post_tags and post_categories to posts were dropped: "
+                          "a partitioned table can only be referenced through its (id, created_at) primary key.")
+        self.status(options)
+
+    def maintain(self, options):
+        created, detached = maintain_partitions(options['months_ahead'], options['detach_after_months'])
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partition(s): {', '.join(created) or '-'}"))
+        self.stdout.write(self.style.SUCCESS(f"Detached {len(detached)} partition(s): {', '.join(detached) or '-'}"))
+        if detached:
+            self.stdout.write("Detached partitions are plain tables now: archive or drop them once they are no longer needed.")
+
+    def status(self, options):
+        with connection.cursor() as cursor:
+            if not is_partitioned(cursor):
+                self.stdout.write(f"{TABLE} is not partitioned")
+                return
+            partitions = list_partitions(cursor)
+
+        self.stdout.write(f"{TABLE} is partitioned by created_at into {len(partitions)} monthly partitions "
+                          f"(MONTHS_AHEAD={get_partitioning_settings()['MONTHS_AHEAD']}, "
+                          f"DETACH_AFTER_MONTHS={get_partitioning_settings()['DETACH_AFTER_MONTHS']})")
+        for name, month, rows in partitions:
+            self.stdout.write(f"  {name}  {month:%Y-%m}  ~{rows} rows")
+
+    def explain(self, options):
+        with connection.cursor() as cursor:
+            if not is_partitioned(cursor):
+                raise CommandError(f"{TABLE} is not partitioned, convert it first")
+            total = len(list_partitions(cursor))
+
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.filter(is_staff=True).order_by('id').first()
+        if user is None:
+            raise CommandError("No user to authenticate the requests as, pass --user")
+
+        now = timezone.now()
+        paths = options['paths'] or [
+            '/api/v2/posts?count=false',
+            f'/api/v1/posts/archive/{now.year}/{now.month}?count=false',
+            f'/api/v1/posts/archive/{now.year}/{now.month}?count=false&author={user.id}',
+            f'/api/v1/posts/archive/{now.year}?count=false',
+        ]
+
+        client = APIClient()
+        client.force_authenticate(user)
+
+        setup_test_environment()
+        try:
+            for path in paths:
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(path)
+                self.stdout.write(f"\nGET {path}: {response.status_code}")
+
+                # The captured statements have their parameters inlined, they can be run again as they are.
+                statements = [query['sql'] for query in queries.captured_queries
+                              if query['sql'].startswith('SELECT') and f'FROM "{TABLE}"' in query['sql']]
+                with connection.cursor() as cursor:
+                    for sql in statements:
+                        plan, planned, scanned = explain_partitions(cursor, sql)
+                        self.stdout.write(f"  {sql[:160]}{'...' if len(sql) > 160 else ''}")
+                        self.stdout.write(f"  read {len(scanned)} of {total} partitions ({', '.join(scanned) or '-'}), "
+                                          f"{len(planned) - len(scanned)} more planned but never executed, "
+                                          f"{total - len(planned)} pruned while planning")
+                        self.stdout.write('\n'.join(f"    {line}" for line in plan))
+        finally:
+            teardown_test_environment()
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.blog.archive import rebuild_archive
+from apps.blog.models import PostArchiveCount
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-month post counts of the archive from the posts (after upgrading, or to repair drift)."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_archive()
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {PostArchiveCount.objects.count()} archive buckets"))
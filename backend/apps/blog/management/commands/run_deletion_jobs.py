@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.blog.jobs import claim_next_job, run_job
+
+
+class Command(BaseCommand):
+    help = "Process queued user and post deletions in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is empty instead of polling")
+        parser.add_argument('--batch-size', type=int, default=None, help="Number of posts deleted per transaction")
+        parser.add_argument('--poll-interval', type=float, default=5.0, help="Seconds to wait between polls of an empty queue")
+
+    def handle(self, *args, **options):
+        while True:
+            job = claim_next_job()
+
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+
+            job = run_job(job, options['batch_size'])
+            message = f"Deletion job {job.id} ({job.target_type} {job.target_id}): {job.status}, {job.deleted_posts}/{job.total_posts} posts deleted"
+
+            if job.error:
+                self.stderr.write(f"{message}, error: {job.error}")
+            else:
+                self.stdout.write(self.style.SUCCESS(message))
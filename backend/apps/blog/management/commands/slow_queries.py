@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from apps.users.models import User
+from config.slowqueries import get_slow_query_settings, reset_slow_query_log
+
+
+class Command(BaseCommand):
+    help = ("Request API paths in-process and print their statements slower than the threshold, "
+            "with the view and code that issued them and their plan. "
+            "The slow queries of a running server are served by /api/v1/metrics/slow-queries.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help="Paths to request, with their query string")
+        parser.add_argument('--user', help="Username the requests are authenticated as")
+        parser.add_argument('--threshold-ms', type=float, default=get_slow_query_settings()['THRESHOLD_MS'],
+                            help="Duration from which a statement is reported (0 reports every statement)")
+        parser.add_argument('--repeat', type=int, default=1, help="Times each path is requested")
+
+    def handle(self, *args, **options):
+        client = APIClient()
+        if options['user']:
+            try:
+                client.force_authenticate(User.objects.get(username=options['user']))
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist")
+
+        log = reset_slow_query_log(ENABLED=True, THRESHOLD_MS=options['threshold_ms'], MAX_ENTRIES=None)
+
+        setup_test_environment()
+        try:
+            for path in options['paths']:
+                for _ in range(options['repeat']):
+                    response = client.get(path)
+                    self.stdout.write(f"GET {path}: {response.status_code}")
+        finally:
+            teardown_test_environment()
+
+        entries = log.snapshot()['entries']
+        self.stdout.write(f"{len(entries)} statement(s) took {options['threshold_ms']} ms or more")
+        for entry in sorted(entries, key=lambda entry: -entry['duration_ms']):
+            self.stdout.write(f"\n{entry['duration_ms']} ms  {entry['method']} {entry['path']}  view={entry['view']}")
+            for frame in entry['stack']:
+                self.stdout.write(f"  at {frame}")
+            self.stdout.write(f"  {entry['sql']}")
+            if entry['plan']:
+                self.stdout.write('\n'.join(f"    {line}" for line in entry['plan'].splitlines()))
@@ -0,0 +1,98 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+FORWARD_SQL = [
+    """
+    INSERT INTO tags (name, usage_count, created_at, updated_at)
+    SELECT LOWER(TRIM(name)), COUNT(DISTINCT post_id), MIN(created_at), MAX(updated_at)
+    FROM tags_legacy
+    WHERE TRIM(name) <> ''
+    GROUP BY LOWER(TRIM(name));
+    """,
+    """
+    INSERT INTO post_tags (post_id, tag_id, created_at)
+    SELECT legacy.post_id, tags.id, MIN(legacy.created_at)
+    FROM tags_legacy legacy
+    JOIN tags ON tags.name = LOWER(TRIM(legacy.name))
+    GROUP BY legacy.post_id, tags.id;
+    """,
+]
+
+REVERSE_SQL = [
+    """
+    INSERT INTO tags_legacy (name, post_id, created_at, updated_at)
+    SELECT tags.name, post_tags.post_id, post_tags.created_at, post_tags.created_at
+    FROM post_tags
+    JOIN tags ON tags.id = post_tags.tag_id;
+    """,
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_post_content_metadata'),
+    ]
+
+    operations = [
+        # Keep the per-post tag rows aside while the vocabulary takes over the `tags` table.
+        migrations.AlterField(
+            model_name='tag',
+            name='name',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='post',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.post'),
+        ),
+        migrations.RenameModel(
+            old_name='Tag',
+            new_name='LegacyTag',
+        ),
+        migrations.AlterModelTable(
+            name='legacytag',
+            table='tags_legacy',
+        ),
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('usage_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'tags',
+                'indexes': [
+                    models.Index(fields=['name'], name='tags_name_prefix_idx', opclasses=['varchar_pattern_ops']),
+                    models.Index(fields=['-usage_count', 'name'], name='tags_usage_count_idx'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='PostTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='post_tags', to='blog.post')),
+                ('tag', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='post_tags', to='blog.tag')),
+            ],
+            options={
+                'db_table': 'post_tags',
+                'indexes': [models.Index(fields=['tag', 'post'], name='post_tags_tag_post_idx')],
+                'constraints': [models.UniqueConstraint(fields=('post', 'tag'), name='post_tags_post_tag_unique')],
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='tags',
+            field=models.ManyToManyField(related_name='posts', through='blog.PostTag', to='blog.tag'),
+        ),
+        migrations.RunSQL(FORWARD_SQL, REVERSE_SQL),
+        migrations.DeleteModel(
+            name='LegacyTag',
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.1.4 on 2026-10-19 19:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Foreign keys the database cascades through on raw deletes.
+# Django keeps emulating on_delete in Python, and purge_posts deletes tags and categories itself,
+# so this is only a backstop: altering these fields in a later migration recreates the constraints without the cascade.
+CASCADE_FOREIGN_KEYS = [
+    ('posts', 'author_id', 'users'),
+    ('post_tags', 'post_id', 'posts'),
+    ('post_categories', 'post_id', 'posts'),
+]
+
+
+def set_foreign_keys_on_delete(schema_editor, on_delete):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    with connection.cursor() as cursor:
+        for table, column, referenced_table in CASCADE_FOREIGN_KEYS:
+            constraints = connection.introspection.get_constraints(cursor, table)
+            for name, constraint in constraints.items():
+                if constraint['foreign_key'] and constraint['columns'] == [column]:
+                    schema_editor.execute(
+                        f'ALTER TABLE "{table}" DROP CONSTRAINT "{name}", '
+                        f'ADD CONSTRAINT "{name}" FOREIGN KEY ("{column}") REFERENCES "{referenced_table}" ("id") '
+                        f'{on_delete} DEFERRABLE INITIALLY DEFERRED'
+                    )
+
+
+def add_database_cascades(apps, schema_editor):
+    set_foreign_keys_on_delete(schema_editor, 'ON DELETE CASCADE')
+
+
+def remove_database_cascades(apps, schema_editor):
+    set_foreign_keys_on_delete(schema_editor, '')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_normalize_tags'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='pending_deletion',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='DeletionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target_type', models.CharField(choices=[('USER', 'User'), ('POST', 'Post')], max_length=10)),
+                ('target_id', models.BigIntegerField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], db_index=True, default='PENDING', max_length=10)),
+                ('total_posts', models.PositiveIntegerField(default=0)),
+                ('deleted_posts', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'deletion_jobs',
+            },
+        ),
+        migrations.RunPython(add_database_cascades, remove_database_cascades),
+    ]
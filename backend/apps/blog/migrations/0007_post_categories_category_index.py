@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-19 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='postcategory',
+            index=models.Index(fields=['category', 'post'], name='post_categories_cat_post_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-19 19:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_categories_category_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostArchiveCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('ALL', 'All'), ('AUTHOR', 'Author'), ('CATEGORY', 'Category')], max_length=10)),
+                ('scope_id', models.BigIntegerField(default=0)),
+                ('month', models.DateField()),
+                ('post_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'post_archive_counts',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['created_at', 'id'], name='posts_created_at_id_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='postarchivecount',
+            constraint=models.UniqueConstraint(fields=('scope', 'scope_id', 'month'), name='post_archive_counts_unique'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-19 19:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_related_posts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostViewCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('views', models.PositiveBigIntegerField(default=0)),
+                ('post', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='blog.post')),
+            ],
+            options={
+                'db_table': 'post_view_counts',
+                'indexes': [models.Index(fields=['bucket'], name='post_view_counts_bucket_idx')],
+                'constraints': [models.UniqueConstraint(fields=('post', 'bucket'), name='post_view_counts_post_bucket_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-19 19:42
+
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_view_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(django.db.models.functions.comparison.Collate(django.db.models.functions.text.Upper('title'), 'C'), models.F('id'), condition=models.Q(('pending_deletion', False), ('status', 'PUBLISHED')), name='posts_title_suggest_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-19 19:59
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_title_suggest_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tag',
+            name='tags_name_prefix_idx',
+        ),
+    ]
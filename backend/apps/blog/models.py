@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Collate, Upper
 from apps.users.models import User
 
 
@@ -7,17 +8,45 @@ class PostStatus(models.TextChoices):
     PUBLISHED = 'PUBLISHED', 'Published'
 
 
+class PostManager(models.Manager):
+    def get_queryset(self):
+        """
+            Hide posts waiting for background deletion.
+        """
+        return super().get_queryset().filter(pending_deletion=False)
+
+
 class Post(models.Model):
     title = models.CharField(max_length=255, db_index=True)
     content = models.TextField(blank=True, null=True)
+    excerpt = models.CharField(max_length=300, blank=True, default='')
+    word_count = models.PositiveIntegerField(default=0)
+    content_length = models.PositiveIntegerField(default=0)
+    reading_time = models.PositiveSmallIntegerField(default=0)
+    pending_deletion = models.BooleanField(default=False)
+    version = models.PositiveIntegerField(default=1)
     status = models.CharField(max_length=10, choices=PostStatus.choices, default=PostStatus.DRAFT, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts', db_index=True)
+    tags = models.ManyToManyField('Tag', through='PostTag', related_name='posts')
+
+    objects = PostManager()
+    all_objects = models.Manager()
 
     class Meta:
         db_table = 'posts'
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='posts_updated_at_id_idx'),
+            models.Index(fields=['created_at', 'id'], name='posts_created_at_id_idx'),
+            # Title suggestions: a case-insensitive prefix range scan, already in order, over the visible published posts only
+            models.Index(
+                Collate(Upper('title'), 'C'), models.F('id'),
+                name='posts_title_suggest_idx',
+                condition=models.Q(status='PUBLISHED', pending_deletion=False)
+            ),
+        ]
 
     def __str__(self):
         """
@@ -50,6 +79,9 @@ class PostCategory(models.Model):
 
     class Meta:
         db_table = 'post_categories'
+        indexes = [
+            models.Index(fields=['category', 'post'], name='post_categories_cat_post_idx'),
+        ]
 
     def __str__(self):
         """
@@ -59,17 +91,163 @@ class PostCategory(models.Model):
 
 
 class Tag(models.Model):
-    name = models.CharField(max_length=255, db_index=True)
+    name = models.CharField(max_length=255, unique=True)
+    usage_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='tags')
-
     class Meta:
         db_table = 'tags'
+        indexes = [
+            # Prefix autocomplete (name LIKE 'x%') uses the varchar_pattern_ops index PostgreSQL gets for the unique name
+            models.Index(fields=['-usage_count', 'name'], name='tags_usage_count_idx'),
+        ]
 
     def __str__(self):
         """
             Return a string representation of the tag.
         """
-        return f"Tag: {self.name} for Post '{self.post.title}'"
+        return f"Tag: {self.name}"
+
+
+class PostTag(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='post_tags', db_index=False)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='post_tags', db_index=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'post_tags'
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'tag'], name='post_tags_post_tag_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', 'post'], name='post_tags_tag_post_idx'),
+        ]
+
+    def __str__(self):
+        """
+            Return a string representation of the post-tag relation.
+        """
+        return f"Post '{self.post.title}' is tagged '{self.tag.name}'"
+
+
+class PostTombstone(models.Model):
+    post_id = models.BigIntegerField()
+    author_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'post_tombstones'
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='post_tombstones_deleted_idx'),
+        ]
+
+    def __str__(self):
+        """
+            Return a string representation of the tombstone.
+        """
+        return f"Post {self.post_id} deleted at {self.deleted_at}"
+
+
+class RelatedPost(models.Model):
+    # Plain columns on the database side: rows of purged posts are dropped by the next build_related_posts run,
+    # not by the purge, so deleting posts stays a single DELETE.
+    post = models.ForeignKey(Post, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='related_posts')
+    related = models.ForeignKey(Post, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'related_posts'
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'rank'], name='related_posts_post_rank_unique'),
+        ]
+
+    def __str__(self):
+        """
+            Return a string representation of the related post.
+        """
+        return f"Post {self.related_id} is related to post {self.post_id} ({self.score:.2f})"
+
+
+class PostViewCount(models.Model):
+    # No database constraint, like related_posts: counts of purged posts are left behind and skipped by the rankings.
+    post = models.ForeignKey(Post, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+')
+    bucket = models.DateTimeField()
+    views = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'post_view_counts'
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'bucket'], name='post_view_counts_post_bucket_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket'], name='post_view_counts_bucket_idx'),
+        ]
+
+    def __str__(self):
+        """
+            Return a string representation of the view count.
+        """
+        return f"Post {self.post_id}: {self.views} views from {self.bucket}"
+
+
+class ArchiveScope(models.TextChoices):
+    ALL = 'ALL', 'All'
+    AUTHOR = 'AUTHOR', 'Author'
+    CATEGORY = 'CATEGORY', 'Category'
+
+
+class PostArchiveCount(models.Model):
+    scope = models.CharField(max_length=10, choices=ArchiveScope.choices)
+    scope_id = models.BigIntegerField(default=0)
+    month = models.DateField()
+    post_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'post_archive_counts'
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'scope_id', 'month'], name='post_archive_counts_unique'),
+        ]
+
+    def __str__(self):
+        """
+            Return a string representation of the archive bucket.
+        """
+        return f"{self.scope} {self.scope_id} {self.month:%Y-%m}: {self.post_count} posts"
+
+
+class DeletionTarget(models.TextChoices):
+    USER = 'USER', 'User'
+    POST = 'POST', 'Post'
+
+
+class DeletionJobStatus(models.TextChoices):
+    PENDING = 'PENDING', 'Pending'
+    RUNNING = 'RUNNING', 'Running'
+    DONE = 'DONE', 'Done'
+    FAILED = 'FAILED', 'Failed'
+
+
+class DeletionJob(models.Model):
+    target_type = models.CharField(max_length=10, choices=DeletionTarget.choices)
+    target_id = models.BigIntegerField()
+    status = models.CharField(max_length=10, choices=DeletionJobStatus.choices, default=DeletionJobStatus.PENDING, db_index=True)
+    total_posts = models.PositiveIntegerField(default=0)
+    deleted_posts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+
+    class Meta:
+        db_table = 'deletion_jobs'
+
+    def __str__(self):
+        """
+            Return a string representation of the deletion job.
+        """
+        return f"Deletion of {self.target_type} {self.target_id}: {self.status}"
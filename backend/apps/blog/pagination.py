@@ -1,27 +1,99 @@
+from django.core.paginator import Paginator, Page, InvalidPage, EmptyPage, PageNotAnInteger
+from django.db.models import QuerySet
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework import status
 from datetime import datetime
 
+from apps.blog.counts import get_cached_count, estimate_count
+
+
+class UncountedPage(Page):
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class UncountedPaginator(Paginator):
+    """
+        Page through a queryset without counting it: each page fetches one extra row to tell whether another follows.
+    """
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+
+        if not rows and number > 1:
+            raise EmptyPage("That page contains no results")
+        return UncountedPage(rows[:self.per_page], number, self, len(rows) > self.per_page)
+
 
 class PostPagination(PageNumberPagination):
     """
         Pagination class for handling paginated responses for posts.
+
+        The total count is, in order of preference: left out when the client sends `count=false`,
+        the planner's estimate for lists of the whole table (`estimate_count=True`, PostgreSQL only),
+        or an exact count cached per filter until the next post write.
+        Besides querysets, it pages any sequence that can be counted and sliced, such as cached search results.
     """
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
 
+    def __init__(self, estimate_count=False):
+        self.estimate_count = estimate_count
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        self.count, self.count_estimated = None, False
+
+        if request.query_params.get('count', '').lower() not in ('false', '0'):
+            if self.estimate_count:
+                self.count = estimate_count(queryset.model)
+                self.count_estimated = self.count is not None
+            if self.count is None:
+                self.count = get_cached_count(queryset) if isinstance(queryset, QuerySet) else queryset.count()
+
+        if self.count is not None and not self.count_estimated:
+            paginator = self.django_paginator_class(queryset, page_size)
+            paginator.count = self.count
+        else:
+            paginator = UncountedPaginator(queryset, page_size)
+
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        return list(self.page)
+
     def get_paginated_response(self, data):
         return Response({
             'status_code': status.HTTP_200_OK,
             'message': "Posts have been retrieved successfully",
             'timestamp': datetime.now().isoformat(),
             'data': {
-                'count': self.page.paginator.count,
+                'count': self.count,
+                'count_estimated': self.count_estimated,
                 'next': self.get_next_link(),
                 'previous': self.get_previous_link(),
                 'results': data
             }
         })
-
@@ -0,0 +1,252 @@
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.blog.archive import remove_posts_from_archive
+from apps.blog.jobs import record_tombstones
+from apps.blog.models import Post, PostCategory, PostTag
+from apps.blog.utils import release_post_tags
+
+
+DEFAULT_SETTINGS = {
+    'MONTHS_AHEAD': 3,
+    'DETACH_AFTER_MONTHS': None,
+}
+
+TABLE = Post._meta.db_table
+UNPARTITIONED_TABLE = f'{TABLE}_unpartitioned'
+SEQUENCE = f'{TABLE}_id_seq'
+PARTITION_RE = re.compile(rf'^{TABLE}_p(\d{{4}})_(\d{{2}})$')
+PLAN_PARTITION_RE = re.compile(rf'\bon ({TABLE}_p\d{{4}}_\d{{2}})\b')
+
+
+class PartitioningError(Exception):
+    """
+        Raised when the posts table cannot be converted or its partitions cannot be managed.
+    """
+
+
+def get_partitioning_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'POSTS_PARTITIONING', {})}
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def month_start(moment):
+    return datetime(moment.year, moment.month, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y_%m}'
+
+
+def is_partitioned(cursor):
+    """
+        Tell whether the posts table is range partitioned, on PostgreSQL.
+    """
+    if connection.vendor != 'postgresql':
+        return False
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = %s::regclass", [TABLE])
+    return cursor.fetchone()[0] == 'p'
+
+
+def posts_partitioned():
+    with connection.cursor() as cursor:
+        return is_partitioned(cursor)
+
+
+def list_partitions(cursor):
+    """
+        Return the monthly partitions of the posts table, oldest first, as [(name, month, estimated rows), ...].
+    """
+    cursor.execute(
+        "SELECT c.relname, c.reltuples::bigint FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = %s::regclass", [TABLE]
+    )
+    partitions = []
+    for name, rows in cursor.fetchall():
+        match = PARTITION_RE.match(name)
+        if match:
+            partitions.append((name, datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc), max(rows, 0)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partition(cursor, month):
+    """
+        Create the partition holding the posts created in a month, unless it exists. Returns True when created.
+    """
+    name = partition_name(month)
+    cursor.execute("SELECT to_regclass(%s) IS NULL", [name])
+    if not cursor.fetchone()[0]:
+        return False
+
+    cursor.execute(
+        f'CREATE TABLE "{name}" PARTITION OF "{TABLE}" FOR VALUES FROM (%s) TO (%s)',
+        [month, add_months(month, 1)]
+    )
+    return True
+
+
+def convert_to_partitioned(months_ahead=None, keep_unpartitioned=False):
+    """
+        Replace the posts table with a copy range partitioned by month of created_at, in one transaction.
+
+        The primary key of a partitioned table must include the partition key, so it becomes (id, created_at)
+        and the foreign keys from post_tags and post_categories, which need a unique posts.id, are dropped
+        (purge_posts deletes their rows itself). Ids keep coming from a sequence
+        continuing the current one. Every other index, check and foreign key of the table is recreated.
+        Returns the names of the partitions created.
+    """
+    months_ahead = get_partitioning_settings()['MONTHS_AHEAD'] if months_ahead is None else months_ahead
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor != 'postgresql':
+            raise PartitioningError("Partitioning needs PostgreSQL")
+        if is_partitioned(cursor):
+            raise PartitioningError(f"{TABLE} is already partitioned")
+
+        cursor.execute(f'LOCK TABLE "{TABLE}" IN ACCESS EXCLUSIVE MODE')
+        # Deferred foreign key checks still pending in the transaction would prevent dropping those constraints.
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+        cursor.execute("SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'", [TABLE])
+        primary_key = cursor.fetchone()[0]
+        cursor.execute("SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s", [TABLE])
+        indexes = [(name, definition) for name, definition in cursor.fetchall() if name != primary_key]
+        if any(definition.startswith('CREATE UNIQUE') for _, definition in indexes):
+            raise PartitioningError(f"{TABLE} has a unique index without created_at, which a partitioned table cannot enforce")
+
+        cursor.execute("SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'", [TABLE])
+        foreign_keys = cursor.fetchall()
+        cursor.execute("SELECT conrelid::regclass::text, conname FROM pg_constraint WHERE confrelid = %s::regclass AND contype = 'f'", [TABLE])
+        referencing = cursor.fetchall()
+
+        cursor.execute(f'SELECT min(created_at), max(id) FROM "{TABLE}"')
+        oldest, max_id = cursor.fetchone()
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+        old_sequence = cursor.fetchone()[0]
+        cursor.execute(f'SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM {old_sequence}')
+        last_id = max(cursor.fetchone()[0], max_id or 0)
+        cursor.execute("SELECT attidentity <> '' FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'", [TABLE])
+        identity = cursor.fetchone()[0]
+
+        for table, name in referencing:
+            cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+
+        # Move the current table and its index names aside, so the new table takes over the original names.
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{UNPARTITIONED_TABLE}"')
+        cursor.execute(f'ALTER TABLE "{UNPARTITIONED_TABLE}" RENAME CONSTRAINT "{primary_key}" TO "{UNPARTITIONED_TABLE}_pkey"')
+        for number, (name, _) in enumerate(indexes):
+            cursor.execute(f'ALTER INDEX "{name}" RENAME TO "{UNPARTITIONED_TABLE}_idx{number}"')
+        # The table kept with keep_unpartitioned is an inert copy: nothing it references waits on it.
+        for name, _ in foreign_keys:
+            cursor.execute(f'ALTER TABLE "{UNPARTITIONED_TABLE}" DROP CONSTRAINT "{name}"')
+        # Drops the identity or serial sequence of the old ids: partitioned tables cannot have identity columns.
+        if identity:
+            cursor.execute(f'ALTER TABLE "{UNPARTITIONED_TABLE}" ALTER COLUMN id DROP IDENTITY')
+        else:
+            cursor.execute(f'ALTER TABLE "{UNPARTITIONED_TABLE}" ALTER COLUMN id DROP DEFAULT')
+            cursor.execute(f'DROP SEQUENCE {old_sequence}')
+
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{UNPARTITIONED_TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE) '
+            f'PARTITION BY RANGE (created_at)'
+        )
+        cursor.execute(f'CREATE SEQUENCE "{SEQUENCE}" AS bigint OWNED BY "{TABLE}".id')
+        if last_id:
+            cursor.execute("SELECT setval(%s, %s)", [SEQUENCE, last_id])
+        cursor.execute(f'''ALTER TABLE "{TABLE}" ALTER COLUMN id SET DEFAULT nextval('"{SEQUENCE}"')''')
+
+        current = month_start(timezone.now())
+        month = month_start(oldest) if oldest else current
+        created = []
+        while month <= add_months(current, months_ahead):
+            create_partition(cursor, month)
+            created.append(partition_name(month))
+            month = add_months(month, 1)
+
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{UNPARTITIONED_TABLE}"')
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{primary_key}" PRIMARY KEY (id, created_at)')
+        for _, definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
+
+        if not keep_unpartitioned:
+            cursor.execute(f'DROP TABLE "{UNPARTITIONED_TABLE}"')
+        cursor.execute(f'ANALYZE "{TABLE}"')
+
+    return created
+
+
+def retire_partition_posts(month):
+    """
+        Do for the posts of a partition about to be detached what deleting them would: uncount them from the
+        archive, record their tombstones (which also drops the cached counts, statistics and search results),
+        release their tags and delete their tags and categories, which no foreign key ties to them anymore.
+        Posts already pending deletion went through the first two steps when their deletion was scheduled.
+    """
+    posts = Post.all_objects.filter(created_at__gte=month, created_at__lt=add_months(month, 1))
+    remove_posts_from_archive(posts.filter(pending_deletion=False))
+    record_tombstones(posts.filter(pending_deletion=False))
+    release_post_tags(posts)
+    PostTag.objects.filter(post_id__in=posts.values('id')).delete()
+    PostCategory.objects.filter(post_id__in=posts.values('id')).delete()
+
+
+def maintain_partitions(months_ahead=None, detach_after_months=None):
+    """
+        Create the partitions of the coming months, and detach the partitions older than `detach_after_months`
+        months (never with None), once their posts are retired like deleted ones (see retire_partition_posts).
+        Detached partitions stay in the database as plain tables, out of every read.
+        Returns the names of the partitions created and detached.
+    """
+    options = get_partitioning_settings()
+    months_ahead = options['MONTHS_AHEAD'] if months_ahead is None else months_ahead
+    detach_after_months = options['DETACH_AFTER_MONTHS'] if detach_after_months is None else detach_after_months
+
+    created, detached = [], []
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            raise PartitioningError(f"{TABLE} is not partitioned, convert it first")
+
+        current = month_start(timezone.now())
+        for offset in range(months_ahead + 1):
+            if create_partition(cursor, add_months(current, offset)):
+                created.append(partition_name(add_months(current, offset)))
+
+        if detach_after_months is not None:
+            cutoff = add_months(current, -detach_after_months)
+            for name, month, _ in list_partitions(cursor):
+                if month < cutoff:
+                    retire_partition_posts(month)
+                    cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+                    detached.append(name)
+
+    return created, detached
+
+
+def explain_partitions(cursor, sql, params=None):
+    """
+        Run a statement under EXPLAIN ANALYZE and return its plan with the partitions it read: the ones the plan
+        scans minus those it never executed. Partitions pruned while planning do not appear in the plan at all.
+    """
+    cursor.execute(f'EXPLAIN (ANALYZE, COSTS OFF, TIMING OFF, SUMMARY OFF) {sql}', params)
+    plan = [row[0] for row in cursor.fetchall()]
+
+    planned, scanned = set(), set()
+    for line in plan:
+        match = PLAN_PARTITION_RE.search(line)
+        if match:
+            planned.add(match[1])
+            if '(never executed)' not in line:
+                scanned.add(match[1])
+
+    return plan, sorted(planned), sorted(scanned)
@@ -0,0 +1,144 @@
+import atexit
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections
+from django.db.models import Sum
+from django.utils import timezone
+
+from apps.blog.models import PostViewCount
+
+
+RANKING_WINDOWS = {
+    'day': timedelta(days=1),
+    'week': timedelta(days=7),
+}
+
+UPSERT_BATCH_SIZE = 1000
+
+
+def current_bucket():
+    """
+        Return the start of the hour views are counted in.
+    """
+    return timezone.now().replace(minute=0, second=0, microsecond=0)
+
+
+def upsert_view_counts(counts):
+    """
+        Add {(post id, bucket): views} to the view counts table, with batched INSERT ... ON CONFLICT statements
+        that increment the existing rows in place.
+    """
+    table = PostViewCount._meta.db_table
+    rows = [(post_id, connection.ops.adapt_datetimefield_value(bucket), views) for (post_id, bucket), views in counts.items()]
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
+            cursor.execute(
+                f"INSERT INTO {table} (post_id, bucket, views) VALUES {', '.join(['(%s, %s, %s)'] * len(batch))} "
+                f"ON CONFLICT (post_id, bucket) DO UPDATE SET views = {table}.views + EXCLUDED.views",
+                [value for row in batch for value in row]
+            )
+
+
+def prune_view_counts():
+    """
+        Delete the view counts older than the longest ranking window, which no ranking reads anymore.
+    """
+    PostViewCount.objects.filter(bucket__lte=current_bucket() - max(RANKING_WINDOWS.values())).delete()
+
+
+def compute_ranking(window):
+    """
+        Return the most viewed visible posts over a window, as [(post id, views), ...].
+    """
+    since = current_bucket() - RANKING_WINDOWS[window]
+    rows = PostViewCount.objects.filter(bucket__gt=since, post__pending_deletion=False).values('post_id').annotate(
+        total=Sum('views')
+    ).order_by('-total', 'post_id').values_list('post_id', 'total')
+
+    return list(rows[:getattr(settings, 'POST_VIEWS_RANKING_SIZE', 100)])
+
+
+def refresh_rankings():
+    for window in RANKING_WINDOWS:
+        cache.set(f'popular_posts:{window}', compute_ranking(window), getattr(settings, 'POST_VIEWS_RANKING_TIMEOUT', 300))
+
+
+def get_ranking(window):
+    """
+        Return the ranking of a window as refreshed by the last flush, computing it when it expired.
+    """
+    return cache.get_or_set(f'popular_posts:{window}', lambda: compute_ranking(window), getattr(settings, 'POST_VIEWS_RANKING_TIMEOUT', 300))
+
+
+class ViewBuffer:
+    """
+        The post views counted by this process since the last flush, per post and hour.
+        Views are added in memory; every POST_VIEWS_FLUSH_SECONDS the next view starts a thread
+        writing them to the database in a few statements and refreshing the rankings,
+        so reading a post never waits on a row lock. Views not flushed yet are lost if the process crashes.
+        The first flush of each hour also prunes the counts that fell out of every ranking window.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._counts = Counter()
+        self._last_flush = time.monotonic()
+        self._pruned_bucket = None
+
+    def add(self, post_id):
+        bucket = current_bucket()
+
+        with self._lock:
+            self._counts[(post_id, bucket)] += 1
+            due = time.monotonic() - self._last_flush >= getattr(settings, 'POST_VIEWS_FLUSH_SECONDS', 30)
+            if due:
+                self._last_flush = time.monotonic()
+
+        if due:
+            threading.Thread(target=self.flush_in_thread, daemon=True).start()
+
+    def flush(self):
+        """
+            Write the buffered views and refresh the rankings. Views that fail to be written are kept for the next flush.
+        """
+        with self._flush_lock:
+            with self._lock:
+                counts, self._counts = self._counts, Counter()
+            if not counts:
+                return
+
+            try:
+                upsert_view_counts(counts)
+            except Exception:
+                with self._lock:
+                    self._counts.update(counts)
+                raise
+
+            bucket = current_bucket()
+            if self._pruned_bucket != bucket:
+                prune_view_counts()
+                self._pruned_bucket = bucket
+
+            refresh_rankings()
+
+    def flush_in_thread(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+
+view_buffer = ViewBuffer()
+atexit.register(view_buffer.flush)
+
+
+def record_post_view(post_id):
+    view_buffer.add(post_id)
@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+import numpy as np
+from scipy import sparse
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from apps.blog.models import Post, PostCategory, PostTag, PostTombstone, RelatedPost
+
+
+DEFAULT_SETTINGS = {
+    'COUNT': 10,
+    'TAG_WEIGHT': 1.0,
+    'CATEGORY_WEIGHT': 0.5,
+    'BATCH_SIZE': 1000,
+}
+
+
+def get_related_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'RELATED_POSTS', {})}
+
+
+class PostFeatures:
+    """
+        The visible posts as rows of a sparse, L2-normalized post x (tags + categories) matrix,
+        so the product of two rows is the weighted cosine similarity of the posts.
+    """
+
+    def __init__(self, tag_weight, category_weight):
+        self.post_ids = np.fromiter(Post.objects.order_by('id').values_list('id', flat=True).iterator(), dtype=np.int64)
+        self.rows = {post_id: row for row, post_id in enumerate(self.post_ids.tolist())}
+
+        tags = self.load_pairs(PostTag.objects.filter(post__in=Post.objects.all()).values_list('post_id', 'tag_id'))
+        categories = self.load_pairs(PostCategory.objects.filter(post__in=Post.objects.all()).values_list('post_id', 'category_id'))
+        # Feature ids are used as column numbers: tag columns first, then category columns.
+        tag_columns = int(tags[:, 1].max()) + 1 if len(tags) else 0
+        category_columns = int(categories[:, 1].max()) + 1 if len(categories) else 0
+
+        rows = np.concatenate([tags[:, 0], categories[:, 0]])
+        columns = np.concatenate([tags[:, 1], categories[:, 1] + tag_columns])
+        weights = np.concatenate([np.full(len(tags), tag_weight), np.full(len(categories), category_weight)])
+
+        matrix = sparse.csr_matrix((weights, (rows, columns)), shape=(len(self.post_ids), tag_columns + category_columns))
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        self.matrix = sparse.diags(1 / norms).dot(matrix).tocsr()
+        self.transposed = self.matrix.T.tocsc()
+
+    def load_pairs(self, pairs):
+        """
+            Turn (post id, feature id) pairs into unique (row, feature id) pairs.
+        """
+        pairs = {(self.rows[post_id], feature_id) for post_id, feature_id in pairs.iterator() if post_id in self.rows}
+        return np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+
+    def similarities(self, rows):
+        """
+            Return the sparse similarities of the given rows with every post, one row per given row.
+        """
+        return (self.matrix[rows] @ self.transposed).tocsr()
+
+    def top_neighbors(self, rows, count):
+        """
+            Yield (post id, [(related post id, score), ...]) with the `count` most similar posts of each row.
+        """
+        similarities = self.similarities(rows)
+
+        for i, row in enumerate(rows):
+            start, end = similarities.indptr[i], similarities.indptr[i + 1]
+            columns, scores = similarities.indices[start:end], similarities.data[start:end]
+
+            keep = (columns != row) & (scores > 0)
+            columns, scores = columns[keep], scores[keep]
+
+            # Rounded, and ties broken by post id, so a post ranks the same whichever batch computes it.
+            scores = np.round(scores, 6)
+            order = np.lexsort((self.post_ids[columns], -scores))[:count]
+            yield int(self.post_ids[row]), [(int(self.post_ids[columns[j]]), float(scores[j])) for j in order]
+
+
+def store_neighbors(neighbors, computed_at):
+    """
+        Replace the related posts of the posts in a batch.
+    """
+    neighbors = list(neighbors)
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=[post_id for post_id, _ in neighbors]).delete()
+        RelatedPost.objects.bulk_create([
+            RelatedPost(post_id=post_id, related_id=related_id, rank=rank, score=score, computed_at=computed_at)
+            for post_id, related in neighbors
+            for rank, (related_id, score) in enumerate(related, start=1)
+        ])
+
+
+def affected_posts(features, changed_ids, removed_ids, count):
+    """
+        Return the posts whose related posts may differ after the given posts changed or were removed:
+        the changed posts, the posts listing a changed or removed post, and the posts that a changed post
+        is now at least as similar to as their last related post.
+    """
+    affected = set(changed_ids)
+    affected.update(RelatedPost.objects.filter(related_id__in=list(changed_ids) + list(removed_ids)).values_list('post_id', flat=True))
+
+    rows = [features.rows[post_id] for post_id in changed_ids if post_id in features.rows]
+    if rows:
+        best = features.similarities(rows).max(axis=0).tocoo()
+        # Rounded like the stored scores, so a tie with the last related post is seen as one.
+        candidates = {int(features.post_ids[column]): float(score) for column, score in zip(best.col, np.round(best.data, 6)) if score > 0}
+        lists = {
+            row['post_id']: row
+            for row in RelatedPost.objects.filter(post_id__in=list(candidates)).values('post_id').annotate(lowest=Min('score'), total=Count('id')).order_by()
+        }
+        # A tie can still displace the last related post when the changed post has a lower id, as in top_neighbors.
+        affected.update(
+            post_id for post_id, score in candidates.items()
+            if post_id not in lists or lists[post_id]['total'] < count or score >= lists[post_id]['lowest']
+        )
+
+    return affected & set(features.rows)
+
+
+def build_related_posts(full=False):
+    """
+        Recompute the related posts of every post (full=True), or of the posts affected by the posts changed
+        or deleted since the last run. Returns the number of posts whose related posts were recomputed.
+    """
+    options = get_related_settings()
+    started = timezone.now()
+    features = PostFeatures(options['TAG_WEIGHT'], options['CATEGORY_WEIGHT'])
+
+    last_run = RelatedPost.objects.aggregate(last=Max('computed_at'))['last']
+    if full or last_run is None:
+        rows = list(range(len(features.post_ids)))
+        RelatedPost.objects.exclude(post_id__in=Post.objects.all()).delete()
+    else:
+        # Overlap the previous run a little, so posts committed late with an earlier timestamp are not missed.
+        since = last_run - timedelta(seconds=getattr(settings, 'SYNC_SETTLE_SECONDS', 2))
+        changed_ids = set(Post.all_objects.filter(updated_at__gte=since).values_list('id', flat=True))
+        removed_ids = set(PostTombstone.objects.filter(deleted_at__gte=since).values_list('post_id', flat=True))
+        removed_ids |= {post_id for post_id in changed_ids if post_id not in features.rows}
+
+        RelatedPost.objects.filter(post_id__in=removed_ids).delete()
+        rows = sorted(features.rows[post_id] for post_id in affected_posts(features, changed_ids - removed_ids, removed_ids, options['COUNT']))
+
+    batch_size = options['BATCH_SIZE']
+    for start in range(0, len(rows), batch_size):
+        store_neighbors(features.top_neighbors(rows[start:start + batch_size], options['COUNT']), started)
+
+    return len(rows)
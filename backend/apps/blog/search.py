@@ -0,0 +1,211 @@
+import hashlib
+import pickle
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Collate, Upper
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.blog.models import Post, PostStatus
+from apps.users.models import User
+
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'TIMEOUT': 300,
+    'WINDOW_SIZE': 100,
+}
+
+GENERATION_KEY = 'post_search:generation'
+
+
+def get_search_cache_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'SEARCH_CACHE', {})}
+
+
+def normalize_search_term(term):
+    """
+        Reduce a search term to the form it is matched and cached under: trimmed, single-spaced and lowercased
+        (the match ignores case anyway).
+    """
+    return ' '.join(term.split()).lower()
+
+
+def search_posts(term, posts=None):
+    """
+        Return the posts (of `posts`, all by default) whose title, content, tags or author name contain the term, newest first.
+    """
+    return (Post.objects.all() if posts is None else posts).filter(
+        Q(title__icontains=term) |
+        Q(content__icontains=term) |
+        Q(tags__name__icontains=term) |
+        Q(author__first_name__icontains=term) |
+        Q(author__last_name__icontains=term)
+    ).distinct().order_by('-created_at', '-id')
+
+
+def suggest_titles(prefix, limit):
+    """
+        Return the id and title of the first published posts whose title starts with the prefix, ignoring case,
+        in title order, cached for TITLE_SUGGEST_CACHE_TIMEOUT seconds.
+
+        The prefix is matched as a range on UPPER(title) in the C collation, where the range of titles starting
+        with a prefix is contiguous, so the partial posts_title_suggest_idx index answers it with a short scan.
+    """
+    prefix = ' '.join(prefix.split()).upper()
+    if not prefix:
+        return []
+
+    def compute():
+        posts = Post.objects.filter(status=PostStatus.PUBLISHED).annotate(title_key=Collate(Upper('title'), 'C')).filter(title_key__gte=prefix)
+        if ord(prefix[-1]) < sys.maxunicode:
+            posts = posts.filter(title_key__lt=prefix[:-1] + chr(ord(prefix[-1]) + 1))
+        return list(posts.order_by('title_key', 'id').values('id', 'title')[:limit])
+
+    key = f'title_suggest:{hashlib.sha256(prefix.encode()).hexdigest()}:{limit}'
+    return cache.get_or_set(key, compute, getattr(settings, 'TITLE_SUGGEST_CACHE_TIMEOUT', 30))
+
+
+def get_generation():
+    return cache.get_or_set(GENERATION_KEY, 1, None)
+
+
+def invalidate_search_results():
+    """
+        Make every cached search result stale, once the current transaction commits.
+        Called by every write to posts, their tags or the names of their authors.
+    """
+    def bump():
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.set(GENERATION_KEY, 1, None)
+
+    transaction.on_commit(bump)
+
+
+class SearchCacheStats:
+    """
+        Hit and miss counters of the search cache in this process, and the size of the entries it wrote
+        that are still alive (same generation, not expired).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.generation = None
+        self.entries = {}
+
+    def record(self, hit):
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stored(self, generation, key, size, timeout):
+        now = time.monotonic()
+        with self.lock:
+            if generation != self.generation:
+                self.generation, self.entries = generation, {}
+            self.entries = {key: entry for key, entry in self.entries.items() if entry[1] > now}
+            self.entries[key] = (size, now + timeout)
+
+    def snapshot(self):
+        now = time.monotonic()
+        generation = get_generation()
+        with self.lock:
+            live = [size for size, expires in self.entries.values() if expires > now] if generation == self.generation else []
+            lookups = self.hits + self.misses
+            return {
+                'generation': generation,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'entries': len(live),
+                'bytes': sum(live),
+            }
+
+
+stats = SearchCacheStats()
+
+
+class SearchResults:
+    """
+        The posts matching a search term, as a sequence the paginators can count and slice.
+
+        The ordered ids are cached per generation, term and window of WINDOW_SIZE results, and the total
+        per generation and term; a page is then read with one query by primary key. Any write that could
+        change a result bumps the generation, so stale entries are never read again and simply expire.
+    """
+
+    def __init__(self, term, posts):
+        """
+            `posts` is the queryset the matching posts are read from (with its prefetches and deferred fields).
+        """
+        options = get_search_cache_settings()
+        self.term = term
+        self.posts = posts
+        self.timeout = options['TIMEOUT']
+        self.window_size = options['WINDOW_SIZE']
+        self.generation = get_generation()
+        self.prefix = f'post_search:{self.generation}:{hashlib.sha256(term.encode()).hexdigest()}'
+
+    def cached(self, key, compute):
+        value = cache.get(key)
+        stats.record(value is not None)
+        if value is None:
+            value = compute()
+            cache.set(key, value, self.timeout)
+            stats.stored(self.generation, key, len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)), self.timeout)
+        return value
+
+    def count(self):
+        return self.cached(f'{self.prefix}:count', lambda: search_posts(self.term).count())
+
+    def window(self, number):
+        start = number * self.window_size
+        return self.cached(
+            f'{self.prefix}:{number}',
+            lambda: list(search_posts(self.term).values_list('id', flat=True)[start:start + self.window_size])
+        )
+
+    def ids(self, start, stop):
+        ids = []
+        for number in range(start // self.window_size, (stop - 1) // self.window_size + 1):
+            window = self.window(number)
+            ids.extend(window)
+            if len(window) < self.window_size:
+                break
+
+        first = start - (start // self.window_size) * self.window_size
+        return ids[first:first + stop - start]
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step is not None or index.start is None or index.stop is None:
+            raise TypeError("Search results only support [start:stop] slices")
+        if index.stop <= index.start:
+            return []
+
+        ids = self.ids(index.start, index.stop)
+        posts = {post.id: post for post in self.posts.filter(id__in=ids)}
+        # A post hidden since its ids were cached is left out until the generation bump lands.
+        return [posts[post_id] for post_id in ids if post_id in posts]
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    invalidate_search_results()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if not created and (update_fields is None or {'first_name', 'last_name'} & set(update_fields)):
+        invalidate_search_results()
@@ -1,6 +1,15 @@
 from rest_framework import serializers
-
-from apps.blog.models import Post, Category, Tag, PostCategory
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.blog.models import Post, PostStatus, Category, Tag, PostCategory, DeletionJob, RelatedPost
+from apps.blog.utils import build_content_metadata, set_post_tags
+from apps.blog.events import publish_post_events_on_commit
+from apps.blog.counts import invalidate_post_counts
+from apps.blog.stats import invalidate_author_stats
+from apps.blog.search import invalidate_search_results
+from apps.blog.archive import add_posts_to_archive, track_archive_categories
 from apps.users.models import User
 
 
@@ -26,6 +35,12 @@ class TagViewSerializer(serializers.ModelSerializer):
         fields = ['id', 'name']
 
 
+class TagUsageViewSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ['id', 'name', 'usage_count']
+
+
 class AuthorViewSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -39,15 +54,83 @@ class PostViewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Post
-        fields = [ 'id', 'title', 'content', 'status', 'author', 'post_categories', 'tags']
+        fields = [ 'id', 'title', 'content', 'status', 'version', 'author', 'post_categories', 'tags']
 
 
-# Create Serialisers 
+class PostExcerptViewSerializer(serializers.ModelSerializer):
+    author = AuthorViewSerializer()
+    tags = TagViewSerializer(many=True)
+    post_categories = PostCategoryViewSerializer(many=True, source='categories')
 
-class TagCreateSerializer(serializers.ModelSerializer):
     class Meta:
-        model = Tag
-        fields = ['name']
+        model = Post
+        fields = [ 'id', 'title', 'excerpt', 'word_count', 'content_length', 'reading_time', 'status', 'author', 'post_categories', 'tags']
+
+
+class RelatedPostViewSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='related.id')
+    title = serializers.CharField(source='related.title')
+    excerpt = serializers.CharField(source='related.excerpt')
+    reading_time = serializers.IntegerField(source='related.reading_time')
+
+    class Meta:
+        model = RelatedPost
+        fields = ['id', 'title', 'excerpt', 'reading_time', 'score']
+
+
+class PopularPostViewSerializer(serializers.Serializer):
+    id = serializers.IntegerField(source='post.id')
+    title = serializers.CharField(source='post.title')
+    excerpt = serializers.CharField(source='post.excerpt')
+    reading_time = serializers.IntegerField(source='post.reading_time')
+    views = serializers.IntegerField()
+
+
+class PostSuggestionViewSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Post
+        fields = ['id', 'title']
+
+
+class AuthorStatsFeatureSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    posts = serializers.IntegerField()
+
+
+class AuthorStatsViewSerializer(serializers.Serializer):
+    author_id = serializers.IntegerField()
+    posts = serializers.IntegerField()
+    published = serializers.IntegerField()
+    drafts = serializers.IntegerField()
+    words = serializers.IntegerField()
+    reading_time = serializers.IntegerField()
+    first_post_at = serializers.DateTimeField(allow_null=True)
+    last_post_at = serializers.DateTimeField(allow_null=True)
+    top_tags = AuthorStatsFeatureSerializer(many=True)
+    top_categories = AuthorStatsFeatureSerializer(many=True)
+
+
+class DeletionJobViewSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DeletionJob
+        fields = ['id', 'target_type', 'target_id', 'status', 'total_posts', 'deleted_posts', 'progress', 'error', 'created_at', 'finished_at']
+
+    def get_progress(self, job):
+        """
+            Return the share of the posts already purged, between 0 and 1.
+        """
+        if not job.total_posts:
+            return 1.0 if job.status == 'DONE' else 0.0
+        return round(min(job.deleted_posts / job.total_posts, 1.0), 4)
+
+
+# Create Serialisers 
+
+class TagCreateSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255)
 
 class PostCategoryCreateSerializer(serializers.ModelSerializer):
     category_id = serializers.IntegerField()
@@ -65,18 +148,20 @@ class PostCreateSerializer(serializers.ModelSerializer):
         model = Post
         fields = ['title', 'content', 'status', 'post_categories', 'tags']
 
+    @transaction.atomic
     def create(self, validated_data):
         tags_data = validated_data.pop('tags', [])
         categories_data = validated_data.pop('categories', [])
+        validated_data.update(build_content_metadata(validated_data.get('content')))
         post = Post.objects.create(**validated_data)
 
-        for tag_data in tags_data:
-            Tag.objects.create(post=post, **tag_data)
+        set_post_tags(post, [tag_data['name'] for tag_data in tags_data])
 
         for category_data in categories_data:
             category = Category.objects.get(id=category_data['category_id'])
             PostCategory.objects.create(post=post, category=category)
 
+        add_posts_to_archive(Post.objects.filter(id=post.id))
         return post
 
 
@@ -90,6 +175,7 @@ class PostUpdateSerializer(serializers.ModelSerializer):
         model = Post
         fields = ['title', 'content', 'status', 'post_categories', 'tags']
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags_data = validated_data.pop('tags', [])
         categories_data = validated_data.pop('categories', [])
@@ -97,15 +183,117 @@ class PostUpdateSerializer(serializers.ModelSerializer):
         instance.title = validated_data.get('title', None)
         instance.content = validated_data.get('content', None)
         instance.status = validated_data.get('status', None)
+        for field, value in build_content_metadata(instance.content).items():
+            setattr(instance, field, value)
+        instance.version += 1
         instance.save()
 
-        instance.tags.all().delete()
-        for tag_data in tags_data:
-            Tag.objects.create(post=instance, **tag_data)
+        set_post_tags(instance, [tag_data['name'] for tag_data in tags_data])
 
-        instance.categories.all().delete()
-        for category_data in categories_data:
-            category = Category.objects.get(id=category_data['category_id'])
-            PostCategory.objects.create(post=instance, category=category)
+        with track_archive_categories(Post.objects.filter(id=instance.id)):
+            instance.categories.all().delete()
+            for category_data in categories_data:
+                category = Category.objects.get(id=category_data['category_id'])
+                PostCategory.objects.create(post=instance, category=category)
 
         return instance
+
+
+class PostVersionConflict(Exception):
+    """
+        Raised when a post changed since the version the client based its edit on.
+    """
+
+
+class PostPartialUpdateSerializer(serializers.ModelSerializer):
+    tags = TagCreateSerializer(many=True, required=False)
+    post_categories = PostCategoryCreateSerializer(many=True, source='categories', required=False)
+
+    class Meta:
+        model = Post
+        fields = ['title', 'content', 'status', 'post_categories', 'tags']
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        """
+            Write only the columns whose value changed, and the tags or categories only when they were sent.
+            With an `expected_version` in the context, the write is a single conditional UPDATE on that version,
+            so concurrent edits are detected without locking the row beforehand.
+        """
+        tags_data = validated_data.pop('tags', None)
+        categories_data = validated_data.pop('categories', None)
+        expected_version = self.context.get('expected_version')
+
+        changed = {field: value for field, value in validated_data.items() if getattr(instance, field) != value}
+        if 'content' in changed:
+            changed.update(build_content_metadata(changed['content']))
+
+        if not changed and tags_data is None and categories_data is None:
+            if expected_version is not None and expected_version != instance.version:
+                raise PostVersionConflict()
+            return instance
+
+        posts = Post.objects.filter(id=instance.id)
+        if expected_version is not None:
+            posts = posts.filter(version=expected_version)
+
+        if not posts.update(**changed, version=F('version') + 1, updated_at=timezone.now()):
+            raise PostVersionConflict()
+
+        if tags_data is not None:
+            set_post_tags(instance, [tag_data['name'] for tag_data in tags_data])
+
+        if categories_data is not None:
+            wanted_ids = {category_data['category_id'] for category_data in categories_data}
+            current_ids = set(PostCategory.objects.filter(post=instance).values_list('category_id', flat=True))
+            with track_archive_categories(Post.objects.filter(id=instance.id)):
+                PostCategory.objects.filter(post=instance, category_id__in=current_ids - wanted_ids).delete()
+                PostCategory.objects.bulk_create([PostCategory(post=instance, category_id=category_id) for category_id in wanted_ids - current_ids])
+
+        publish_post_events_on_commit('updated', [instance.id])
+        invalidate_post_counts()
+        invalidate_author_stats([instance.author_id])
+        invalidate_search_results()
+        return instance
+
+    def validate_post_categories(self, categories_data):
+        """
+            Check that every category exists, with a single query.
+        """
+        category_ids = {category_data['category_id'] for category_data in categories_data}
+        if Category.objects.filter(id__in=category_ids).count() != len(category_ids):
+            raise serializers.ValidationError("Some categories do not exist.")
+        return categories_data
+
+
+# Batch Serialisers 
+
+class PostBatchOperationSerializer(serializers.Serializer):
+    ACTIONS = ['set_status', 'set_categories', 'add_tags', 'remove_tags', 'delete']
+
+    ids = serializers.ListField(child=serializers.IntegerField(), min_length=1, max_length=100)
+    action = serializers.ChoiceField(choices=ACTIONS)
+    status = serializers.ChoiceField(choices=PostStatus.choices, required=False)
+    category_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    tags = serializers.ListField(child=serializers.CharField(max_length=255), required=False)
+
+    def validate(self, attrs):
+        """
+            Check that the field the action needs is present, and that the categories exist.
+        """
+        required_field = {
+            'set_status': 'status',
+            'set_categories': 'category_ids',
+            'add_tags': 'tags',
+            'remove_tags': 'tags',
+        }.get(attrs['action'])
+
+        if required_field and required_field not in attrs:
+            raise serializers.ValidationError({required_field: f"This field is required for the {attrs['action']} action."})
+
+        category_ids = set(attrs.get('category_ids', []))
+        if category_ids and Category.objects.filter(id__in=category_ids).count() != len(category_ids):
+            raise serializers.ValidationError({'category_ids': "Some categories do not exist."})
+
+        attrs['ids'] = list(dict.fromkeys(attrs['ids']))
+        return attrs
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q, Sum, Value
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.blog.models import Post, PostCategory, PostStatus, PostTag
+
+
+TOP_FEATURES = 10
+
+
+def author_stats_key(author_id):
+    return f'author_stats:{author_id}'
+
+
+def invalidate_author_stats(author_ids):
+    """
+        Drop the cached statistics of the given authors, once the current transaction commits.
+        Called by every write that changes an author's posts, their tags or their categories.
+    """
+    keys = [author_stats_key(author_id) for author_id in set(author_ids)]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def compute_author_stats(author_id):
+    """
+        Return the statistics of an author's visible posts: the post counts per status and content totals
+        from one conditional aggregate, and the most used tags and categories from one grouped UNION query.
+    """
+    totals = Post.objects.filter(author_id=author_id).aggregate(
+        posts=Count('id'),
+        published=Count('id', filter=Q(status=PostStatus.PUBLISHED)),
+        drafts=Count('id', filter=Q(status=PostStatus.DRAFT)),
+        words=Sum('word_count', default=0),
+        reading_time=Sum('reading_time', default=0),
+        first_post_at=Min('created_at'),
+        last_post_at=Max('created_at'),
+    )
+
+    tags = PostTag.objects.filter(post__author_id=author_id, post__pending_deletion=False).values('tag_id').annotate(
+        kind=Value('tag'), name=F('tag__name'), total=Count('post_id')
+    ).values_list('kind', 'tag_id', 'name', 'total').order_by()
+    # A post filed twice under a category counts once.
+    categories = PostCategory.objects.filter(post__author_id=author_id, post__pending_deletion=False).values('category_id').annotate(
+        kind=Value('category'), name=F('category__name'), total=Count('post_id', distinct=True)
+    ).values_list('kind', 'category_id', 'name', 'total').order_by()
+
+    features = {'tag': [], 'category': []}
+    for kind, feature_id, name, total in tags.union(categories, all=True):
+        features[kind].append({'id': feature_id, 'name': name, 'posts': total})
+
+    top = getattr(settings, 'AUTHOR_STATS_TOP', TOP_FEATURES)
+    return {
+        'author_id': author_id,
+        **totals,
+        'top_tags': sorted(features['tag'], key=lambda row: (-row['posts'], row['name']))[:top],
+        'top_categories': sorted(features['category'], key=lambda row: (-row['posts'], row['name']))[:top],
+    }
+
+
+def get_author_stats(author_id):
+    """
+        Return the statistics of an author, cached until one of their posts changes
+        or for AUTHOR_STATS_CACHE_TIMEOUT seconds, which bounds the staleness of renamed tags and categories.
+    """
+    return cache.get_or_set(author_stats_key(author_id), lambda: compute_author_stats(author_id), getattr(settings, 'AUTHOR_STATS_CACHE_TIMEOUT', 600))
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    invalidate_author_stats([instance.author_id])
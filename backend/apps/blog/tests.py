@@ -1 +1,637 @@
-from django.test import TestCase
+import base64
+import tempfile
+from datetime import date, datetime, timedelta
+from importlib import import_module
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import AsyncClient, Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.blog import counts, search
+from apps.blog.archive import apply_archive_deltas, get_archive, rebuild_archive
+from apps.blog.jobs import purge_posts
+from apps.blog.models import (
+    ArchiveScope, Category, Post, PostArchiveCount, PostCategory, PostTag, PostTombstone, PostViewCount, RelatedPost, Tag,
+)
+from apps.blog.partitions import (
+    add_months, convert_to_partitioned, explain_partitions, maintain_partitions, month_start, partition_name, posts_partitioned,
+)
+from apps.blog.popularity import ViewBuffer, current_bucket
+from apps.blog.related import build_related_posts
+from apps.blog.stats import author_stats_key
+from apps.users.models import User
+from config.admission import AdmissionController, get_admission_settings
+
+
+class BlogTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('alice', 'alice@example.com', 'pw', is_staff=True)
+        self.category = Category.objects.create(name='Tech')
+
+    def create_post(self, title, tags=(), **fields):
+        post = Post.objects.create(title=title, content=title, author=self.author, status='PUBLISHED', **fields)
+        PostCategory.objects.create(post=post, category=self.category)
+        for name in tags:
+            tag, _ = Tag.objects.get_or_create(name=name)
+            PostTag.objects.create(post=post, tag=tag)
+            Tag.objects.filter(id=tag.id).update(usage_count=tag.usage_count + 1)
+        return post
+
+
+@override_settings(RELATED_POSTS={'COUNT': 1})
+class RelatedPostsTests(BlogTestCase):
+    def related(self):
+        return list(RelatedPost.objects.order_by('post_id', 'rank').values_list('post_id', 'related_id', 'rank', 'score'))
+
+    def test_incremental_run_matches_full_run_on_ties(self):
+        # C has the lowest id, so once it ties with B it takes B's place in A's single related post.
+        c = self.create_post('C')
+        a = self.create_post('A', tags=['t1'])
+        self.create_post('B', tags=['t1'])
+        build_related_posts(full=True)
+
+        now = timezone.now()
+        Post.all_objects.update(updated_at=now - timedelta(hours=1))
+        RelatedPost.objects.update(computed_at=now - timedelta(minutes=30))
+        PostTag.objects.create(post=c, tag=Tag.objects.get(name='t1'))
+        Post.all_objects.filter(id=c.id).update(updated_at=now)
+
+        build_related_posts()
+        incremental = self.related()
+        build_related_posts(full=True)
+
+        self.assertEqual(incremental, self.related())
+        self.assertIn((a.id, c.id), [(post_id, related_id) for post_id, related_id, _, _ in incremental])
+
+
+class PopularPostsTests(BlogTestCase):
+    def test_flush_prunes_counts_older_than_the_longest_window(self):
+        post = self.create_post('Viewed')
+        PostViewCount.objects.create(post=post, bucket=current_bucket() - timedelta(days=8), views=5)
+        PostViewCount.objects.create(post=post, bucket=current_bucket() - timedelta(days=6), views=3)
+
+        buffer = ViewBuffer()
+        buffer.add(post.id)
+        buffer.flush()
+
+        self.assertEqual(sorted(PostViewCount.objects.values_list('views', flat=True)), [1, 3])
+
+    def test_limit_is_clamped(self):
+        for title in ('First', 'Second'):
+            PostViewCount.objects.create(post=self.create_post(title), bucket=current_bucket(), views=1)
+
+        client = APIClient()
+        client.force_authenticate(self.author)
+        response = client.get('/api/v1/posts/popular?limit=-5')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']), 1)
+
+
+class ProfilingMiddlewareTests(BlogTestCase):
+    def get(self, path, **headers):
+        with tempfile.TemporaryDirectory() as directory:
+            settings = {'ENABLED': True, 'TOKEN': 'secret', 'SAMPLE_EVERY': 0, 'SAMPLE_INTERVAL_MS': 0, 'DIRECTORY': directory}
+            with override_settings(PROFILING=settings):
+                return Client().get(path, headers=headers)
+
+    def test_profiles_requests_carrying_the_token(self):
+        self.assertIsNotNone(self.get('/api/v1/posts', X_Profile='secret').get('X-Profile-Id'))
+        self.assertIsNotNone(self.get('/api/v1/posts?profile=secret').get('X-Profile-Id'))
+
+    def test_ignores_triggers_without_the_token(self):
+        with mock.patch('config.profiling.cProfile.Profile') as profiler:
+            self.get('/api/v1/posts', X_Profile='1')
+            self.get('/api/v1/posts?profile=1')
+
+        profiler.assert_not_called()
+
+
+class AdmissionControlTests(TestCase):
+    def setUp(self):
+        self.controller = AdmissionController({**get_admission_settings(), 'PER_CLIENT_CONCURRENCY': 2})
+
+    def admit(self, address, credentials):
+        request = RequestFactory().get('/api/v1/posts', REMOTE_ADDR=address,
+                                       HTTP_AUTHORIZATION='Basic ' + base64.b64encode(credentials).decode())
+        return self.controller.clients.acquire(self.controller.get_client(request))
+
+    def test_made_up_basic_usernames_do_not_escape_the_ip_cap(self):
+        self.assertEqual([self.admit('10.0.0.1', f'user{i}:x'.encode()) for i in range(3)], [True, True, False])
+
+    def test_basic_username_of_another_client_does_not_take_its_slots(self):
+        self.assertEqual([self.admit('10.0.0.1', b'victim:wrong') for _ in range(3)], [True, True, False])
+        self.assertTrue(self.admit('10.0.0.2', b'victim:pw'))
+
+
+class PurgePostsTests(BlogTestCase):
+    def test_deletes_tags_and_categories_without_database_cascades(self):
+        if connection.vendor == 'postgresql':
+            # The state a later AlterField leaves the foreign keys in: no ON DELETE CASCADE.
+            migration = import_module('apps.blog.migrations.0004_background_deletion')
+            with connection.schema_editor() as schema_editor:
+                migration.remove_database_cascades(None, schema_editor)
+
+        post = self.create_post('Purged', tags=['python'])
+        kept = self.create_post('Kept', tags=['python'])
+
+        with transaction.atomic():
+            purge_posts([post.id])
+
+        self.assertFalse(Post.all_objects.filter(id=post.id).exists())
+        self.assertFalse(PostTag.objects.filter(post_id=post.id).exists())
+        self.assertFalse(PostCategory.objects.filter(post_id=post.id).exists())
+        self.assertTrue(PostTag.objects.filter(post_id=kept.id).exists())
+        self.assertEqual(Tag.objects.get(name='python').usage_count, 1)
+
+
+@override_settings(MIDDLEWARE_PROFILES_ENABLED=True, PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class PostEventsStreamTests(TransactionTestCase):
+    def setUp(self):
+        User.objects.create_user('alice', 'alice@example.com', 'pw')
+
+    async def open_stream(self, credentials):
+        client = AsyncClient()
+        response = await client.get('/api/v1/posts/events', headers={'Authorization': 'Basic ' + base64.b64encode(credentials).decode()})
+        if response.streaming:
+            first = await anext(aiter(response.streaming_content))
+            await response.streaming_content.aclose()
+            return response.status_code, first
+        return response.status_code, None
+
+    async def test_streams_with_basic_credentials_when_the_api_profile_skips_authentication(self):
+        self.assertEqual(await self.open_stream(b'alice:pw'), (200, b'retry: 3000\n\n'))
+
+    async def test_rejects_wrong_credentials_when_the_api_profile_skips_authentication(self):
+        self.assertEqual((await self.open_stream(b'alice:wrong'))[0], 403)
+
+
+@skipUnless(connection.vendor == 'postgresql', "Partitioning needs PostgreSQL")
+class PartitioningTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        current = month_start(timezone.now())
+        # One post in the current month and in each of the three before it, oldest last.
+        self.months = [add_months(current, -offset) for offset in range(4)]
+        self.posts = []
+        for month in self.months:
+            post = self.create_post(f'{month:%Y-%m}', tags=['python'])
+            Post.all_objects.filter(id=post.id).update(created_at=month + timedelta(hours=1))
+            self.posts.append(post)
+        rebuild_archive()
+
+        self.created = convert_to_partitioned(months_ahead=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def partitions_read(self, path):
+        """
+            Request a path and return the partitions read by each of its statements on posts.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(path).status_code, status.HTTP_200_OK)
+
+        statements = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT') and 'FROM "posts"' in query['sql']]
+        self.assertTrue(statements)
+        with connection.cursor() as cursor:
+            return [explain_partitions(cursor, sql)[2] for sql in statements]
+
+    def test_convert_keeps_the_posts_and_their_ids(self):
+        self.assertTrue(posts_partitioned())
+        self.assertEqual(self.created, [partition_name(month) for month in reversed(self.months)] + [partition_name(add_months(self.months[0], 1))])
+        self.assertEqual(sorted(Post.objects.values_list('id', flat=True)), sorted(post.id for post in self.posts))
+
+        post = self.create_post('After')
+        self.assertGreater(post.id, max(post.id for post in self.posts))
+
+    def test_month_archive_reads_one_partition(self):
+        month = self.months[1]
+        self.assertEqual(self.partitions_read(f'/api/v1/posts/archive/{month.year}/{month.month}?count=false'), [[partition_name(month)]])
+
+    def test_year_archive_reads_the_partitions_of_the_year(self):
+        year = self.months[0].year
+        expected = sorted(name for name in self.created if name.startswith(f'posts_p{year}_'))
+        # Partitions of the year holding no rows may be skipped, but no other year's partition is read.
+        for scanned in self.partitions_read(f'/api/v1/posts/archive/{year}?count=false'):
+            self.assertTrue(set(scanned) <= set(expected))
+
+    def test_maintain_creates_partitions_ahead_and_retires_detached_posts(self):
+        created, detached = maintain_partitions(months_ahead=2, detach_after_months=2)
+
+        self.assertEqual(created, [partition_name(add_months(self.months[0], 2))])
+        self.assertEqual(detached, [partition_name(self.months[3])])
+
+        retired = self.posts[3]
+        self.assertFalse(Post.all_objects.filter(id=retired.id).exists())
+        self.assertTrue(PostTombstone.objects.filter(post_id=retired.id).exists())
+        self.assertFalse(PostTag.objects.filter(post_id=retired.id).exists())
+        self.assertFalse(PostCategory.objects.filter(post_id=retired.id).exists())
+        self.assertEqual(Tag.objects.get(name='python').usage_count, 3)
+        self.assertNotIn((self.months[3].year, self.months[3].month), [(bucket['year'], bucket['month']) for bucket in get_archive()])
+
+        self.assertEqual(maintain_partitions(months_ahead=2, detach_after_months=2), ([], []))
+
+
+class PostPatchTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = self.create_post('Original')
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def patch(self, data, **headers):
+        return self.client.patch(f'/api/v1/posts/{self.post.id}', data, format='json', headers=headers)
+
+    def test_updates_a_matching_version(self):
+        response = self.patch({'title': 'Edited'}, If_Match='W/"1"')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], '"2"')
+        post = Post.objects.get(id=self.post.id)
+        self.assertEqual((post.title, post.content, post.version), ('Edited', 'Original', 2))
+        self.assertGreater(post.updated_at, self.post.updated_at)
+
+    def test_rejects_a_stale_version(self):
+        Post.objects.filter(id=self.post.id).update(version=2)
+
+        for response in (self.patch({'title': 'Edited'}, If_Match='"1"'), self.patch({'title': 'Edited', 'version': 1})):
+            self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        post = Post.objects.get(id=self.post.id)
+        self.assertEqual((post.title, post.version), ('Original', 2))
+
+    def test_rejects_an_if_match_without_a_version(self):
+        self.assertEqual(self.patch({'title': 'Edited'}, If_Match='"abc"').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_category_change_publishes_the_update_and_invalidates_caches(self):
+        other = Category.objects.create(name='Science')
+        cache.set(author_stats_key(self.author.id), {'posts': 1})
+        generations = counts.get_generation(), search.get_generation()
+
+        with mock.patch('apps.blog.serializers.publish_post_events_on_commit') as publish, self.captureOnCommitCallbacks(execute=True):
+            response = self.patch({'post_categories': [{'category_id': other.id}]})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(PostCategory.objects.filter(post=self.post).values_list('category_id', flat=True)), [other.id])
+        self.assertEqual(Post.objects.get(id=self.post.id).version, 2)
+        publish.assert_called_once_with('updated', [self.post.id])
+        self.assertIsNone(cache.get(author_stats_key(self.author.id)))
+        self.assertEqual((counts.get_generation(), search.get_generation()), (generations[0] + 1, generations[1] + 1))
+
+
+class PostBatchOperationTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.posts = [self.create_post(title, tags=['python']) for title in ('First', 'Second')]
+        self.ids = [post.id for post in self.posts]
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def apply(self, action, ids=None, **fields):
+        return self.client.post('/api/v1/posts/batch/operations', {'ids': ids or self.ids, 'action': action, **fields}, format='json')
+
+    def assert_bumped(self):
+        for post in Post.all_objects.filter(id__in=self.ids):
+            self.assertEqual(post.version, 2)
+            self.assertGreater(post.updated_at, self.posts[0].updated_at)
+
+    def usage(self, name):
+        return Tag.objects.get(name=name).usage_count
+
+    def test_rejects_the_whole_batch_when_a_post_is_not_owned(self):
+        bob = User.objects.create_user('bob', 'bob@example.com', 'pw')
+        foreign = Post.objects.create(title='Foreign', content='Foreign', author=bob, status='PUBLISHED')
+
+        response = self.apply('set_status', ids=[self.ids[0], foreign.id], status='DRAFT')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data['data'], [{'id': self.ids[0], 'result': 'skipped'}, {'id': foreign.id, 'result': 'forbidden'}])
+        self.assertEqual(set(Post.objects.values_list('status', 'version')), {('PUBLISHED', 1)})
+
+    def test_set_status(self):
+        self.assertEqual(self.apply('set_status', status='DRAFT').status_code, status.HTTP_200_OK)
+
+        self.assertEqual(set(Post.objects.filter(id__in=self.ids).values_list('status', flat=True)), {'DRAFT'})
+        self.assert_bumped()
+        self.assertEqual(self.usage('python'), 2)
+
+    def test_set_categories(self):
+        other = Category.objects.create(name='Science')
+
+        self.assertEqual(self.apply('set_categories', category_ids=[other.id, other.id]).status_code, status.HTTP_200_OK)
+
+        self.assertEqual(sorted(PostCategory.objects.values_list('post_id', 'category_id')), [(post_id, other.id) for post_id in self.ids])
+        self.assert_bumped()
+        self.assertEqual(self.usage('python'), 2)
+
+    def test_add_tags(self):
+        self.assertEqual(self.apply('add_tags', tags=['Django', 'python']).status_code, status.HTTP_200_OK)
+
+        self.assert_bumped()
+        self.assertEqual((self.usage('django'), self.usage('python')), (2, 2))
+        self.assertEqual(PostTag.objects.filter(post_id__in=self.ids).count(), 4)
+
+    def test_remove_tags(self):
+        self.assertEqual(self.apply('remove_tags', tags=['python'], ids=self.ids[:1]).status_code, status.HTTP_200_OK)
+
+        self.assertEqual(Post.all_objects.get(id=self.ids[0]).version, 2)
+        self.assertEqual(Post.all_objects.get(id=self.ids[1]).version, 1)
+        self.assertEqual(self.usage('python'), 1)
+        self.assertEqual(list(PostTag.objects.values_list('post_id', flat=True)), self.ids[1:])
+
+    def test_delete(self):
+        response = self.apply('delete', ids=self.ids + [0])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['result'] for result in response.data['data']], ['deleted', 'deleted', 'not_found'])
+        self.assertFalse(Post.objects.filter(id__in=self.ids).exists())
+        self.assert_bumped()
+
+        with transaction.atomic():
+            purge_posts(self.ids)
+        self.assertEqual(self.usage('python'), 0)
+
+
+class PostChangesTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def walk(self, cursor=None, limit=2):
+        """
+            Page through the change feed from a cursor, returning the (type, post id) of each change and the last cursor.
+        """
+        seen = []
+        while True:
+            response = self.client.get('/api/v1/posts/changes', {'limit': limit, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            data = response.data['data']
+            seen += [(change['type'], change['post']['id'] if change['type'] == 'upsert' else change['id']) for change in data['changes']]
+            cursor = data['next_cursor']
+            if not data['has_more']:
+                return seen, cursor
+
+    def test_pages_through_changes_sharing_a_timestamp(self):
+        moment = timezone.now() - timedelta(minutes=1)
+        posts = [self.create_post(f'Post {i}') for i in range(3)]
+        Post.all_objects.filter(id__in=[post.id for post in posts]).update(updated_at=moment)
+        PostTombstone.objects.bulk_create([PostTombstone(post_id=1000 + i, author_id=self.author.id, deleted_at=moment) for i in range(3)])
+
+        seen, _ = self.walk()
+
+        self.assertEqual(seen, [('upsert', post.id) for post in posts] + [('delete', 1000 + i) for i in range(3)])
+
+    @override_settings(SYNC_SETTLE_SECONDS=60)
+    def test_holds_back_unsettled_changes_until_they_settle(self):
+        settled = self.create_post('Settled')
+        Post.all_objects.filter(id=settled.id).update(updated_at=timezone.now() - timedelta(minutes=5))
+        fresh = self.create_post('Fresh')
+
+        seen, cursor = self.walk()
+        self.assertEqual(seen, [('upsert', settled.id)])
+
+        with override_settings(SYNC_SETTLE_SECONDS=0):
+            self.assertEqual(self.walk(cursor)[0], [('upsert', fresh.id)])
+
+    def test_rejects_a_malformed_cursor(self):
+        # Not base64, too few parts, not a timestamp, and a timestamp without a timezone
+        malformed = ['not a cursor'] + [base64.urlsafe_b64encode(value).decode() for value in (b'2024-01-01|0', b'yesterday|0|1', b'2024-01-01T00:00:00|0|1')]
+        for cursor in malformed:
+            response = self.client.get('/api/v1/posts/changes', {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PostTitleSuggestTests(BlogTestCase):
+    def test_limit_is_clamped(self):
+        for title in ('Django tips', 'Django tricks'):
+            self.create_post(title)
+
+        client = APIClient()
+        client.force_authenticate(self.author)
+        response = client.get('/api/v1/posts/suggest', {'q': 'django', 'limit': -1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([post['title'] for post in response.data['data']], ['Django tips'])
+
+
+class TagListTests(BlogTestCase):
+    def test_limits_are_clamped(self):
+        self.create_post('First', tags=['python', 'pytest'])
+
+        client = APIClient()
+        client.force_authenticate(self.author)
+        for path in ('/api/v1/tags/autocomplete?q=py&limit=-1', '/api/v1/tags/popular?limit=-1'):
+            response = client.get(path)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['data']), 1)
+
+
+class PostByTagTests(BlogTestCase):
+    def test_pages_posts_created_at_the_same_time_once_each(self):
+        posts = [self.create_post(f'Post {i}', tags=['python']) for i in range(3)]
+        Post.all_objects.update(created_at=timezone.now())
+
+        client = APIClient()
+        client.force_authenticate(self.author)
+        ids = [
+            post['id']
+            for page in range(1, 4)
+            for post in client.get(f'/api/v1/posts/tag/python?page={page}&page_size=1').data['data']['results']
+        ]
+
+        self.assertEqual(ids, sorted((post.id for post in posts), reverse=True))
+
+
+class PostCountTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.posts = [self.create_post(f'Post {i}', tags=['python']) for i in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def page(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['data']
+
+    def test_cached_count_lasts_until_the_next_post_write(self):
+        path = '/api/v1/posts/tag/python'
+        self.assertEqual(self.page(path)['count'], 3)
+
+        # bulk_create sends no post_save, so the cached count is served as is.
+        quiet = Post.objects.bulk_create([Post(title='Quiet', content='Quiet', author=self.author)])[0]
+        PostTag.objects.create(post=quiet, tag=Tag.objects.get(name='python'))
+        generation = counts.get_generation()
+        self.assertEqual(self.page(path)['count'], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_post('Loud', tags=['python'])
+        self.assertEqual(counts.get_generation(), generation + 1)
+        self.assertEqual(self.page(path)['count'], 5)
+
+    @override_settings(POST_COUNT_ESTIMATE_THRESHOLD=0)
+    def test_whole_table_lists_use_the_planner_estimate_on_postgresql(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE posts')
+
+        data = self.page('/api/v2/posts?page_size=2')
+
+        self.assertEqual((data['count'], data['count_estimated']), (3, connection.vendor == 'postgresql'))
+        self.assertIsNotNone(data['next'])
+        self.assertFalse(self.page('/api/v1/posts/tag/python')['count_estimated'])
+
+    def test_uncounted_pages_tell_whether_another_follows(self):
+        with CaptureQueriesContext(connection) as queries:
+            first = self.page('/api/v1/posts/tag/python?count=false&page_size=2')
+        last = self.page('/api/v1/posts/tag/python?count=false&page_size=2&page=2')
+
+        self.assertEqual((first['count'], len(first['results'])), (None, 2))
+        self.assertIsNotNone(first['next'])
+        self.assertFalse([query for query in queries.captured_queries if 'COUNT(' in query['sql']])
+        self.assertEqual(len(last['results']), 1)
+        self.assertIsNone(last['next'])
+
+
+class SearchResultsTests(BlogTestCase):
+    def search(self, term):
+        return [post.id for post in search.SearchResults(term, Post.objects.select_related('author'))[0:10]]
+
+    def test_slice_of_cached_ids_is_read_with_one_query(self):
+        posts = [self.create_post(f'Django {i}') for i in range(3)]
+        self.search('django')
+
+        with self.assertNumQueries(1):
+            results = search.SearchResults('django', Post.objects.select_related('author'))[1:3]
+            self.assertEqual([post.author.username for post in results], ['alice', 'alice'])
+        self.assertEqual([post.id for post in results], [posts[1].id, posts[0].id])
+
+    def test_post_write_bumps_the_generation(self):
+        first = self.create_post('Django')
+        self.assertEqual(self.search('django'), [first.id])
+
+        # bulk_create sends no post_save: the cached ids are still served.
+        Post.objects.bulk_create([Post(title='Django quiet', content='Quiet', author=self.author, status='PUBLISHED')])
+        self.assertEqual(self.search('django'), [first.id])
+
+        generation = search.get_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            second = self.create_post('Django loud')
+        self.assertEqual(search.get_generation(), generation + 1)
+        self.assertEqual(self.search('django')[0], second.id)
+        self.assertEqual(len(self.search('django')), 3)
+
+    def test_author_name_change_bumps_the_generation(self):
+        post = self.create_post('Untitled')
+        self.assertEqual(self.search('smith'), [])
+
+        generation = search.get_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.last_login = timezone.now()
+            self.author.save(update_fields=['last_login'])
+        self.assertEqual(search.get_generation(), generation)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.last_name = 'Smith'
+            self.author.save(update_fields=['last_name'])
+        self.assertEqual(search.get_generation(), generation + 1)
+        self.assertEqual(self.search('smith'), [post.id])
+
+
+class PostByCategoriesTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.science = Category.objects.create(name='Science')
+        self.tech = self.create_post('Tech only')
+        self.both = self.create_post('Tech and science')
+        PostCategory.objects.create(post=self.both, category=self.science)
+        self.science_only = Post.objects.create(title='Science only', content='Science', author=self.author, status='PUBLISHED')
+        PostCategory.objects.create(post=self.science_only, category=self.science)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def ids(self, query):
+        response = self.client.get(f'/api/v1/posts/categories?{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [post['id'] for post in response.data['data']['results']]
+
+    def test_any_returns_each_post_in_one_of_the_categories_once(self):
+        self.assertEqual(self.ids(f'ids={self.category.id},{self.science.id}'), [self.science_only.id, self.both.id, self.tech.id])
+        self.assertEqual(self.ids(f'ids={self.science.id}&match=any'), [self.science_only.id, self.both.id])
+
+    def test_all_returns_the_posts_in_every_category(self):
+        self.assertEqual(self.ids(f'ids={self.category.id},{self.science.id},{self.science.id}&match=all'), [self.both.id])
+
+    def test_accepts_at_most_twenty_distinct_categories(self):
+        ids = [self.category.id, self.science.id] + [10 ** 6 + i for i in range(18)]
+        self.assertEqual(len(self.ids('ids=' + ','.join(map(str, ids + ids[:1])))), 3)
+        response = self.client.get('/api/v1/posts/categories?ids=' + ','.join(map(str, ids + [10 ** 7])))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ArchiveTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.science = Category.objects.create(name='Science')
+        self.posts = [self.create_post(title) for title in ('January', 'February', 'February again')]
+        Post.all_objects.filter(id=self.posts[0].id).update(created_at=timezone.make_aware(datetime(2024, 1, 15)))
+        Post.all_objects.filter(id__in=[post.id for post in self.posts[1:]]).update(created_at=timezone.make_aware(datetime(2024, 2, 15)))
+        rebuild_archive()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def buckets(self):
+        return set(PostArchiveCount.objects.filter(post_count__gt=0).values_list('scope', 'scope_id', 'month', 'post_count'))
+
+    def assert_consistent(self):
+        """
+            Check that the incrementally maintained buckets match the ones rebuilt from scratch.
+        """
+        buckets = self.buckets()
+        rebuild_archive()
+        self.assertEqual(buckets, self.buckets())
+
+    def test_apply_archive_deltas_creates_and_updates_buckets(self):
+        january, february = date(2024, 1, 1), date(2024, 2, 1)
+        apply_archive_deltas({
+            (ArchiveScope.ALL, 0, january): 2,
+            (ArchiveScope.ALL, 0, february): -1,
+            (ArchiveScope.CATEGORY, self.science.id, january): 2,
+            (ArchiveScope.AUTHOR, self.author.id, january): 0,
+        })
+
+        self.assertEqual(get_archive(), [{'year': 2024, 'month': 2, 'count': 1}, {'year': 2024, 'month': 1, 'count': 3}])
+        self.assertEqual(get_archive(ArchiveScope.CATEGORY, self.science.id), [{'year': 2024, 'month': 1, 'count': 2}])
+        self.assertEqual(get_archive(ArchiveScope.AUTHOR, self.author.id), [{'year': 2024, 'month': 2, 'count': 2}, {'year': 2024, 'month': 1, 'count': 1}])
+
+    def test_counts_follow_category_changes(self):
+        response = self.client.patch(f'/api/v1/posts/{self.posts[0].id}', {'post_categories': [{'category_id': self.science.id}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_archive(ArchiveScope.CATEGORY, self.science.id), [{'year': 2024, 'month': 1, 'count': 1}])
+        self.assert_consistent()
+
+        response = self.client.post('/api/v1/posts/batch/operations', {
+            'ids': [post.id for post in self.posts[1:]], 'action': 'set_categories', 'category_ids': [self.category.id, self.science.id],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_archive(ArchiveScope.CATEGORY, self.science.id), [{'year': 2024, 'month': 2, 'count': 2}, {'year': 2024, 'month': 1, 'count': 1}])
+        self.assert_consistent()
+
+    def test_counts_are_kept_by_status_changes(self):
+        response = self.client.post('/api/v1/posts/batch/operations', {'ids': [self.posts[0].id], 'action': 'set_status', 'status': 'DRAFT'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_archive(), [{'year': 2024, 'month': 2, 'count': 2}, {'year': 2024, 'month': 1, 'count': 1}])
+        self.assert_consistent()
+
+    def test_counts_drop_deleted_posts(self):
+        self.assertEqual(self.client.delete(f'/api/v1/posts/{self.posts[1].id}').status_code, status.HTTP_202_ACCEPTED)
+
+        self.assertEqual(get_archive(), [{'year': 2024, 'month': 2, 'count': 1}, {'year': 2024, 'month': 1, 'count': 1}])
+        self.assertEqual(get_archive(ArchiveScope.CATEGORY, self.category.id), [{'year': 2024, 'month': 2, 'count': 1}, {'year': 2024, 'month': 1, 'count': 1}])
+        self.assert_consistent()
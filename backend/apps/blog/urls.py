@@ -1,15 +1,31 @@
 from django.urls import path
 
-from apps.blog.views import PostListCreateView, PostListPaginationView, PostByCategoryView, PostByAuthorView, PostSearchView, PostDetailView
+from apps.blog.views import PostListCreateView, PostListPaginationView, PostByCategoryView, PostByCategoriesView, PostArchiveView, PostArchivePeriodView, PostByAuthorView, AuthorStatsView, PostSearchView, PostTitleSuggestView, PostDetailView, PostByTagView, PostRelatedView, PopularPostsView, TagAutocompleteView, PopularTagsView, DeletionJobDetailView, PostChangesView, PostEventsStreamView, PostBatchView, PostBatchOperationView
 
 
 urlpatterns = [
     path('v1/posts', PostListCreateView.as_view(), name='post-list-create'),
     path('v2/posts', PostListPaginationView.as_view(), name='post-list'),
     path('v1/posts/category/<int:category_id>', PostByCategoryView.as_view(), name='posts_by_category'),
+    path('v1/posts/categories', PostByCategoriesView.as_view(), name='posts_by_categories'),
+    path('v1/posts/archive', PostArchiveView.as_view(), name='post-archive'),
+    path('v1/posts/archive/<int:year>', PostArchivePeriodView.as_view(), name='posts_by_year'),
+    path('v1/posts/archive/<int:year>/<int:month>', PostArchivePeriodView.as_view(), name='posts_by_month'),
     path('v1/posts/author/<int:author_id>', PostByAuthorView.as_view(), name='posts_by_author'),
+    path('v1/posts/author/<int:author_id>/stats', AuthorStatsView.as_view(), name='author-stats'),
+    path('v1/posts/tag/<str:tag_name>', PostByTagView.as_view(), name='posts_by_tag'),
+    path('v1/posts/batch', PostBatchView.as_view(), name='post-batch'),
+    path('v1/posts/batch/operations', PostBatchOperationView.as_view(), name='post-batch-operations'),
+    path('v1/posts/changes', PostChangesView.as_view(), name='post-changes'),
+    path('v1/posts/events', PostEventsStreamView.as_view(), name='post-events'),
+    path('v1/posts/popular', PopularPostsView.as_view(), name='post-popular'),
     path('v1/posts/search', PostSearchView.as_view(), name='post-search'),
+    path('v1/posts/suggest', PostTitleSuggestView.as_view(), name='post-suggest'),
     path('v1/posts/<int:post_id>', PostDetailView.as_view(), name='post-detail-update-delete'),
+    path('v1/posts/<int:post_id>/related', PostRelatedView.as_view(), name='post-related'),
+    path('v1/tags/autocomplete', TagAutocompleteView.as_view(), name='tag-autocomplete'),
+    path('v1/tags/popular', PopularTagsView.as_view(), name='tag-popular'),
+    path('v1/deletion-jobs/<int:job_id>', DeletionJobDetailView.as_view(), name='deletion-job-detail'),
 ]
 
 
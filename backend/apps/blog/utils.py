@@ -0,0 +1,123 @@
+import math
+from collections import Counter, defaultdict
+
+from django.db.models import Count, Exists, F, OuterRef
+
+from apps.blog.models import Tag, PostTag, PostCategory
+
+
+EXCERPT_LENGTH = 300
+WORDS_PER_MINUTE = 200
+
+
+def build_content_metadata(content):
+    """
+        Derive the excerpt, word count, content length and reading time (minutes) of a post content.
+    """
+    content = content or ''
+    words = content.split()
+    word_count = len(words)
+
+    excerpt = ' '.join(words)
+    if len(excerpt) > EXCERPT_LENGTH:
+        excerpt = excerpt[:EXCERPT_LENGTH - 3].rsplit(' ', 1)[0] + '...'
+
+    return {
+        'excerpt': excerpt,
+        'word_count': word_count,
+        'content_length': len(content),
+        'reading_time': math.ceil(word_count / WORDS_PER_MINUTE),
+    }
+
+
+def normalize_tag_name(name):
+    """
+        Normalize a tag name so the same tag always maps to the same vocabulary row.
+    """
+    return (name or '').strip().lower()
+
+
+def adjust_tag_usage(tag_counts, sign):
+    """
+        Increment (sign=1) or decrement (sign=-1) the usage count of tags, given a {tag_id: count} mapping.
+        Tags sharing the same count are updated with a single query.
+    """
+    ids_by_count = defaultdict(list)
+    for tag_id, count in tag_counts.items():
+        ids_by_count[count].append(tag_id)
+
+    for count, tag_ids in ids_by_count.items():
+        Tag.objects.filter(id__in=tag_ids).update(usage_count=F('usage_count') + sign * count)
+
+
+def set_post_tags(post, names):
+    """
+        Attach exactly the given tag names to a post, creating missing vocabulary rows,
+        and only touching the post-tag rows and usage counts that actually change.
+    """
+    names = {normalize_tag_name(name) for name in names} - {''}
+
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    wanted_ids = set(Tag.objects.filter(name__in=names).values_list('id', flat=True))
+    current_ids = set(PostTag.objects.filter(post=post).values_list('tag_id', flat=True))
+
+    added_ids = wanted_ids - current_ids
+    removed_ids = current_ids - wanted_ids
+
+    if removed_ids:
+        PostTag.objects.filter(post=post, tag_id__in=removed_ids).delete()
+        adjust_tag_usage({tag_id: 1 for tag_id in removed_ids}, -1)
+
+    if added_ids:
+        PostTag.objects.bulk_create([PostTag(post=post, tag_id=tag_id) for tag_id in added_ids])
+        adjust_tag_usage({tag_id: 1 for tag_id in added_ids}, 1)
+
+
+def add_posts_tags(post_ids, names):
+    """
+        Attach tag names to several posts at once, skipping the pairs that already exist.
+    """
+    names = {normalize_tag_name(name) for name in names} - {''}
+    if not names or not post_ids:
+        return
+
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    tag_ids = list(Tag.objects.filter(name__in=names).values_list('id', flat=True))
+    existing = set(PostTag.objects.filter(post_id__in=post_ids, tag_id__in=tag_ids).values_list('post_id', 'tag_id'))
+
+    added = [(post_id, tag_id) for post_id in post_ids for tag_id in tag_ids if (post_id, tag_id) not in existing]
+    PostTag.objects.bulk_create([PostTag(post_id=post_id, tag_id=tag_id) for post_id, tag_id in added])
+    adjust_tag_usage(Counter(tag_id for _, tag_id in added), 1)
+
+
+def remove_posts_tags(post_ids, names):
+    """
+        Detach tag names from several posts at once.
+    """
+    names = {normalize_tag_name(name) for name in names} - {''}
+    post_tags = PostTag.objects.filter(post_id__in=post_ids, tag__name__in=names)
+
+    removed = Counter(post_tags.values_list('tag_id', flat=True))
+    post_tags.delete()
+    adjust_tag_usage(removed, -1)
+
+
+def release_post_tags(posts):
+    """
+        Decrement the usage count of every tag attached to the given posts, before they are deleted.
+    """
+    tag_counts = PostTag.objects.filter(post__in=posts).values('tag_id').annotate(total=Count('id')).order_by()
+    adjust_tag_usage({row['tag_id']: row['total'] for row in tag_counts}, -1)
+
+
+def filter_posts_by_categories(posts, category_ids, match='any'):
+    """
+        Keep the posts in any (or, with match='all', every one) of the given categories.
+        Each category test is an EXISTS probe of post_categories, so no join multiplies the rows and no DISTINCT is needed.
+    """
+    if match == 'all':
+        for category_id in category_ids:
+            posts = posts.filter(Exists(PostCategory.objects.filter(post_id=OuterRef('pk'), category_id=category_id)))
+        return posts
+
+    return posts.filter(Exists(PostCategory.objects.filter(post_id=OuterRef('pk'), category_id__in=category_ids)))
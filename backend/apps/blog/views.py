@@ -3,12 +3,72 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from django.db.models import Prefetch
 from rest_framework import status
-from django.db.models import Q
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from django.views import View
+import asyncio
+import base64
+import binascii
 
-from config.response import generate_response
-from apps.blog.serializers import PostViewSerializer, PostCreateSerializer, PostUpdateSerializer
-from apps.blog.models import Post, PostCategory
+from config.response import generate_response, generate_json_response
+from apps.blog.serializers import PostViewSerializer, PostExcerptViewSerializer, PostCreateSerializer, PostUpdateSerializer, PostPartialUpdateSerializer, PostVersionConflict, TagUsageViewSerializer, DeletionJobViewSerializer, RelatedPostViewSerializer, PopularPostViewSerializer, AuthorStatsViewSerializer, PostSuggestionViewSerializer, PostBatchOperationSerializer
+from apps.blog.models import Post, PostCategory, Tag, DeletionJob, ArchiveScope, RelatedPost
 from apps.blog.pagination import PostPagination 
+from apps.blog.utils import normalize_tag_name, filter_posts_by_categories
+from apps.blog.jobs import schedule_post_deletion
+from apps.blog.batch import BatchOwnershipError, run_batch_operation
+from apps.blog.archive import get_archive, month_range
+from apps.blog.popularity import RANKING_WINDOWS, get_ranking, record_post_view
+from apps.blog.stats import get_author_stats
+from apps.blog.search import SearchResults, get_search_cache_settings, normalize_search_term, search_posts, suggest_titles
+from apps.blog.sync import UPSERT, encode_cursor, decode_cursor, since_position, get_post_changes
+from apps.blog.events import broadcaster, format_event
+from apps.users.hashing import HashingBusy, aauthenticate_user
+from apps.users.models import User
+
+
+LIST_MODE_PARAMETER = OpenApiParameter(name='mode', type=str, enum=['full', 'excerpt'], description="'excerpt' returns the excerpt and content metadata instead of the full content", required=False)
+
+
+COUNT_PARAMETER = OpenApiParameter(name='count', type=bool, description="'false' leaves out the total count, which saves counting the matching posts", required=False)
+
+
+def apply_list_mode(posts, request):
+    """
+        Return the queryset and serializer class matching the requested list mode.
+        The excerpt mode defers the `content` column so it is never fetched from the database.
+    """
+    if request.query_params.get('mode') == 'excerpt':
+        return posts.defer('content'), PostExcerptViewSerializer
+
+    return posts, PostViewSerializer
+
+
+def parse_if_match(request):
+    """
+        Return the post version an If-Match header (e.g. "3" or W/"3") requires, or None without the header.
+        Raises ValueError when the header does not hold a version.
+    """
+    value = request.headers.get('If-Match')
+    if value is None or value.strip() == '*':
+        return None
+    return int(value.strip().removeprefix('W/').strip('"'))
+
+
+def with_etag(response, post):
+    """
+        Set the ETag of a post response to the post version.
+    """
+    response['ETag'] = f'"{post.version}"'
+    return response
+
+
+def parse_id_list(value):
+    """
+        Parse a comma separated list of ids ("1,2,3"). Raises ValueError when an id is not an integer.
+    """
+    return [int(item) for item in value.split(',') if item.strip()] if value else []
 
 
 class PostListCreateView(APIView):
@@ -21,6 +81,7 @@ class PostListCreateView(APIView):
         tags=["Post"],
         summary="Retrieve a list of posts",
         description="Get a list of all posts.",
+        parameters=[LIST_MODE_PARAMETER],
         responses={
             200: OpenApiResponse(description='List of posts', response=PostViewSerializer(many=True)),
             403: OpenApiResponse(description='Forbidden: Authentication required'),
@@ -33,8 +94,9 @@ class PostListCreateView(APIView):
                 'tags',
                 'author'
             )
+            posts, serializer_class = apply_list_mode(posts, request)
 
-            serializer = PostViewSerializer(posts, many=True)
+            serializer = serializer_class(posts, many=True)
             return generate_response(status.HTTP_200_OK, "Posts retrieved successfully", serializer.data)
 
         except Exception as e:
@@ -76,9 +138,11 @@ class PostListPaginationView(APIView):
         parameters=[
             OpenApiParameter(name='page', type=int, description='The page number to retrieve (default is 1)', required=False),
             OpenApiParameter(name='page_size', type=int, description='The number of posts per page (default is 50)', required=False),
+            LIST_MODE_PARAMETER,
+            COUNT_PARAMETER,
         ],
         summary="Retrieve a list of posts with pagination",
-        description="Get a list of all posts with pagination support (page, page_size).",
+        description="Get a list of all posts, newest first, with pagination support (page, page_size).",
         responses={
             200: OpenApiResponse(description='List of posts', response=PostViewSerializer(many=True)),
             403: OpenApiResponse(description='Forbidden: Authentication required'),
@@ -90,11 +154,12 @@ class PostListPaginationView(APIView):
                 Prefetch('categories', queryset=PostCategory.objects.select_related('category')),
                 'tags',
                 'author'
-            )
+            ).order_by('-created_at', '-id')
+            posts, serializer_class = apply_list_mode(posts, request)
 
-            paginator = PostPagination()
+            paginator = PostPagination(estimate_count=True)
             result_page = paginator.paginate_queryset(posts, request)
-            serializer = PostViewSerializer(result_page, many=True)
+            serializer = serializer_class(result_page, many=True)
 
             return paginator.get_paginated_response(serializer.data)
 
@@ -120,6 +185,8 @@ class PostByCategoryView(APIView):
         parameters=[
             OpenApiParameter(name='page', type=int, description="Page number for pagination"),
             OpenApiParameter(name='page_size', type=int, description="Number of posts per page"),
+            LIST_MODE_PARAMETER,
+            COUNT_PARAMETER,
         ]
     )
     def get(self, request, category_id):
@@ -128,10 +195,172 @@ class PostByCategoryView(APIView):
                 'tags',
                 'author'
             )
+            posts, serializer_class = apply_list_mode(posts, request)
+
+            paginator = PostPagination()
+            result_page = paginator.paginate_queryset(posts, request)
+            serializer = serializer_class(result_page, many=True)
+
+            return paginator.get_paginated_response(serializer.data)
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred: {str(e)}", None)
+
+
+
+class PostByCategoriesView(APIView):
+    """
+        Retrieve a list of posts in any, or all, of several Categories.
+    """
+    permission_classes = [IsAuthenticated]
+    max_categories = 20
+
+    @extend_schema(
+        tags=["Post"],
+        summary="Retrieve posts by several Categories",
+        description="Get a list of posts in any of the given categories (`match=any`, the default) "
+                    "or in every one of them (`match=all`), newest first.",
+        responses={
+            200: OpenApiResponse(description='List of posts by categories', response=PostViewSerializer(many=True)),
+            400: OpenApiResponse(description='Invalid or too many category IDs, or invalid match'),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+        },
+        parameters=[
+            OpenApiParameter(name='ids', type=str, description="Comma separated category IDs (at most 20)", required=True),
+            OpenApiParameter(name='match', type=str, enum=['any', 'all'], description="Whether posts must be in any or all of the categories (default is any)", required=False),
+            OpenApiParameter(name='page', type=int, description="Page number for pagination"),
+            OpenApiParameter(name='page_size', type=int, description="Number of posts per page"),
+            LIST_MODE_PARAMETER,
+            COUNT_PARAMETER,
+        ]
+    )
+    def get(self, request):
+        try:
+            category_ids = list(dict.fromkeys(parse_id_list(request.query_params.get('ids'))))
+        except ValueError:
+            return generate_response(status.HTTP_400_BAD_REQUEST, "ids must be comma separated integers", None)
+
+        match = request.query_params.get('match', 'any')
+        if match not in ('any', 'all'):
+            return generate_response(status.HTTP_400_BAD_REQUEST, "match must be 'any' or 'all'", None)
+        if not category_ids:
+            return generate_response(status.HTTP_400_BAD_REQUEST, "At least one category id is required", None)
+        if len(category_ids) > self.max_categories:
+            return generate_response(status.HTTP_400_BAD_REQUEST, f"At most {self.max_categories} categories can be requested at once", None)
+
+        try:
+            posts = filter_posts_by_categories(Post.objects.all(), category_ids, match).prefetch_related(
+                Prefetch('categories', queryset=PostCategory.objects.select_related('category')),
+                'tags',
+                'author'
+            ).order_by('-created_at', '-id')
+            posts, serializer_class = apply_list_mode(posts, request)
+
+            paginator = PostPagination()
+            result_page = paginator.paginate_queryset(posts, request)
+            serializer = serializer_class(result_page, many=True)
+
+            return paginator.get_paginated_response(serializer.data)
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred: {str(e)}", None)
+
+
+
+class PostArchiveView(APIView):
+    """
+        Number of posts per month, for archive navigation, read from the precomputed rollup.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Post"],
+        summary="Retrieve the post archive",
+        description="Get the months having posts, newest first, with their number of posts. "
+                    "Pass `author` or `category` to count the posts of one author or category only.",
+        responses={
+            200: OpenApiResponse(description='Number of posts per month'),
+            400: OpenApiResponse(description='Invalid author or category, or both given'),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+        },
+        parameters=[
+            OpenApiParameter(name='author', type=int, description="Author ID", required=False),
+            OpenApiParameter(name='category', type=int, description="Category ID", required=False),
+        ]
+    )
+    def get(self, request):
+        author, category = request.query_params.get('author'), request.query_params.get('category')
+        if author and category:
+            return generate_response(status.HTTP_400_BAD_REQUEST, "Filter the archive by author or by category, not both", None)
+
+        try:
+            if author:
+                scope, scope_id = ArchiveScope.AUTHOR, int(author)
+            elif category:
+                scope, scope_id = ArchiveScope.CATEGORY, int(category)
+            else:
+                scope, scope_id = ArchiveScope.ALL, 0
+        except ValueError:
+            return generate_response(status.HTTP_400_BAD_REQUEST, "author and category must be integers", None)
+
+        try:
+            return generate_response(status.HTTP_200_OK, "Archive retrieved successfully", get_archive(scope, scope_id))
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred while retrieving the archive: {str(e)}", None)
+
+
+
+class PostArchivePeriodView(APIView):
+    """
+        Retrieve a list of the posts created in a year or a month.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Post"],
+        summary="Retrieve posts by year or month",
+        description="Get the posts created during a year (`archive/{year}`) or a month (`archive/{year}/{month}`), "
+                    "newest first, optionally of one author or category.",
+        responses={
+            200: OpenApiResponse(description='List of posts of the period', response=PostViewSerializer(many=True)),
+            400: OpenApiResponse(description='Invalid period, author or category'),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+        },
+        parameters=[
+            OpenApiParameter(name='author', type=int, description="Author ID", required=False),
+            OpenApiParameter(name='category', type=int, description="Category ID", required=False),
+            OpenApiParameter(name='page', type=int, description="Page number for pagination"),
+            OpenApiParameter(name='page_size', type=int, description="Number of posts per page"),
+            LIST_MODE_PARAMETER,
+            COUNT_PARAMETER,
+        ]
+    )
+    def get(self, request, year, month=None):
+        try:
+            start, end = month_range(year, month)
+            author, category = request.query_params.get('author'), request.query_params.get('category')
+            author, category = int(author) if author else None, int(category) if category else None
+        except ValueError:
+            return generate_response(status.HTTP_400_BAD_REQUEST, "Invalid period, or author or category is not an integer", None)
+
+        try:
+            posts = Post.objects.filter(created_at__gte=start, created_at__lt=end)
+            if author is not None:
+                posts = posts.filter(author_id=author)
+            if category is not None:
+                posts = filter_posts_by_categories(posts, [category])
+
+            posts = posts.prefetch_related(
+                Prefetch('categories', queryset=PostCategory.objects.select_related('category')),
+                'tags',
+                'author'
+            ).order_by('-created_at', '-id')
+            posts, serializer_class = apply_list_mode(posts, request)
 
             paginator = PostPagination()
             result_page = paginator.paginate_queryset(posts, request)
-            serializer = PostViewSerializer(result_page, many=True)
+            serializer = serializer_class(result_page, many=True)
 
             return paginator.get_paginated_response(serializer.data)
 
@@ -157,6 +386,8 @@ class PostByAuthorView(APIView):
         parameters=[
             OpenApiParameter(name='page', type=int, description="Page number for pagination"),
             OpenApiParameter(name='page_size', type=int, description="Number of posts per page"),
+            LIST_MODE_PARAMETER,
+            COUNT_PARAMETER,
         ]
     )
     def get(self, request, author_id):
@@ -165,10 +396,11 @@ class PostByAuthorView(APIView):
                 'tags',
                 'categories'
             )
+            posts, serializer_class = apply_list_mode(posts, request)
 
             paginator = PostPagination()
             result_page = paginator.paginate_queryset(posts, request)
-            serializer = PostViewSerializer(result_page, many=True)
+            serializer = serializer_class(result_page, many=True)
 
             return paginator.get_paginated_response(serializer.data)
 
@@ -177,6 +409,37 @@ class PostByAuthorView(APIView):
 
 
 
+class AuthorStatsView(APIView):
+    """
+        Retrieve the statistics of an Author's posts, for author dashboards.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Post"],
+        summary="Retrieve Author statistics",
+        description="Get the number of published and draft posts of an Author, their content totals "
+                    "and their most used tags and categories.",
+        responses={
+            200: OpenApiResponse(description='Author statistics', response=AuthorStatsViewSerializer),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+            404: OpenApiResponse(description='Author not found'),
+        }
+    )
+    def get(self, request, author_id):
+        try:
+            stats = get_author_stats(author_id)
+
+            if not stats['posts'] and not User.objects.filter(id=author_id).exists():
+                return generate_response(status.HTTP_404_NOT_FOUND, "Author not found", None)
+
+            return generate_response(status.HTTP_200_OK, "Author statistics retrieved successfully", AuthorStatsViewSerializer(stats).data)
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred while retrieving author statistics: {str(e)}", None)
+
+
+
 class PostSearchView(APIView):
     """
         Search and filter posts by Title, Content, Tags, or Author.
@@ -186,7 +449,8 @@ class PostSearchView(APIView):
     @extend_schema(
         tags=["Post"],
         summary="Search and filter posts",
-        description="Search posts by Title, Content, Tags, or Author.",
+        description="Search posts by Title, Content, Tags, or Author, newest first. "
+                    "Results are cached per search term until the next write to posts, tags or author names.",
         responses={
             200: OpenApiResponse(description='List of filtered posts', response=PostViewSerializer(many=True)),
             403: OpenApiResponse(description='Forbidden: Authentication required'),
@@ -195,33 +459,372 @@ class PostSearchView(APIView):
             OpenApiParameter(name='search', type=str, description="Search term for Title, Content, Tags, or Author"),
             OpenApiParameter(name='page', type=int, description="Page number for pagination"),
             OpenApiParameter(name='page_size', type=int, description="Number of posts per page"),
+            LIST_MODE_PARAMETER,
+            COUNT_PARAMETER,
         ]
     )
     def get(self, request):
-        search_term = request.query_params.get('search', '')
-        posts = Post.objects.all()
-
-        if search_term:
-            search_term = search_term.strip()
-            posts = posts.filter(
-                Q(title__icontains=search_term) | 
-                Q(content__icontains=search_term) | 
-                Q(tags__name__icontains=search_term) | 
-                Q(author__first_name__icontains=search_term) |
-                Q(author__last_name__icontains=search_term)
-            ).distinct()
+        search_term = normalize_search_term(request.query_params.get('search', ''))
+        posts, serializer_class = apply_list_mode(Post.objects.select_related('author').prefetch_related(
+            Prefetch('categories', queryset=PostCategory.objects.select_related('category')),
+            'tags'
+        ), request)
+
+        if search_term and get_search_cache_settings()['ENABLED']:
+            posts = SearchResults(search_term, posts)
+        elif search_term:
+            posts = search_posts(search_term, posts)
+        else:
+            posts = posts.order_by('-created_at', '-id')
 
         paginator = PostPagination()
         result_page = paginator.paginate_queryset(posts, request)
-        serializer = PostViewSerializer(result_page, many=True)
+        serializer = serializer_class(result_page, many=True)
 
         return paginator.get_paginated_response(serializer.data)
 
 
 
+class PostTitleSuggestView(APIView):
+    """
+        Suggest published post titles starting with a prefix, for search-as-you-type.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Post"],
+        summary="Suggest post titles",
+        description="Get the id and title of the published posts whose title starts with the given prefix, ignoring case, "
+                    "in title order. Results are cached for a few seconds.",
+        responses={
+            200: OpenApiResponse(description='List of matching titles', response=PostSuggestionViewSerializer(many=True)),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+        },
+        parameters=[
+            OpenApiParameter(name='q', type=str, description="Title prefix"),
+            OpenApiParameter(name='limit', type=int, description="Maximum number of titles returned (default is 8, max is 20)"),
+        ]
+    )
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 8)), 1), 20)
+
+            suggestions = suggest_titles(request.query_params.get('q', ''), limit)
+
+            return generate_response(status.HTTP_200_OK, "Titles retrieved successfully", PostSuggestionViewSerializer(suggestions, many=True).data)
+
+        except ValueError:
+            return generate_response(status.HTTP_400_BAD_REQUEST, "limit must be an integer", None)
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred while retrieving titles: {str(e)}", None)
+
+
+
+class PostByTagView(APIView):
+    """
+        Retrieve a list of posts carrying a specific Tag.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Post"],
+        summary="Retrieve posts by Tag",
+        description="Get a list of posts carrying a specific Tag.",
+        responses={
+            200: OpenApiResponse(description='List of posts by tag', response=PostViewSerializer(many=True)),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+        },
+        parameters=[
+            OpenApiParameter(name='page', type=int, description="Page number for pagination"),
+            OpenApiParameter(name='page_size', type=int, description="Number of posts per page"),
+            LIST_MODE_PARAMETER,
+            COUNT_PARAMETER,
+        ]
+    )
+    def get(self, request, tag_name):
+        try:
+            posts = Post.objects.filter(post_tags__tag__name=normalize_tag_name(tag_name)).prefetch_related(
+                Prefetch('categories', queryset=PostCategory.objects.select_related('category')),
+                'tags',
+                'author'
+            ).order_by('-created_at', '-id')
+            posts, serializer_class = apply_list_mode(posts, request)
+
+            paginator = PostPagination()
+            result_page = paginator.paginate_queryset(posts, request)
+            serializer = serializer_class(result_page, many=True)
+
+            return paginator.get_paginated_response(serializer.data)
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred: {str(e)}", None)
+
+
+
+class TagAutocompleteView(APIView):
+    """
+        Suggest existing tags starting with a prefix, most used first.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Tag"],
+        summary="Autocomplete tags",
+        description="Get the most used tags whose name starts with the given prefix.",
+        responses={
+            200: OpenApiResponse(description='List of matching tags', response=TagUsageViewSerializer(many=True)),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+        },
+        parameters=[
+            OpenApiParameter(name='q', type=str, description="Tag name prefix"),
+            OpenApiParameter(name='limit', type=int, description="Maximum number of tags returned (default is 10, max is 50)"),
+        ]
+    )
+    def get(self, request):
+        try:
+            prefix = normalize_tag_name(request.query_params.get('q', ''))
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+
+            tags = Tag.objects.filter(name__startswith=prefix, usage_count__gt=0).order_by('-usage_count', 'name')[:limit]
+            serializer = TagUsageViewSerializer(tags, many=True)
+
+            return generate_response(status.HTTP_200_OK, "Tags retrieved successfully", serializer.data)
+
+        except ValueError:
+            return generate_response(status.HTTP_400_BAD_REQUEST, "limit must be an integer", None)
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred while retrieving tags: {str(e)}", None)
+
+
+
+class PopularTagsView(APIView):
+    """
+        Retrieve the most used tags, for tag clouds.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Tag"],
+        summary="Retrieve popular tags",
+        description="Get the most used tags with their usage count.",
+        responses={
+            200: OpenApiResponse(description='List of popular tags', response=TagUsageViewSerializer(many=True)),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+        },
+        parameters=[
+            OpenApiParameter(name='limit', type=int, description="Maximum number of tags returned (default is 50, max is 200)"),
+        ]
+    )
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), 200)
+
+            tags = Tag.objects.filter(usage_count__gt=0).order_by('-usage_count', 'name')[:limit]
+            serializer = TagUsageViewSerializer(tags, many=True)
+
+            return generate_response(status.HTTP_200_OK, "Tags retrieved successfully", serializer.data)
+
+        except ValueError:
+            return generate_response(status.HTTP_400_BAD_REQUEST, "limit must be an integer", None)
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred while retrieving tags: {str(e)}", None)
+
+
+
+class PostChangesView(APIView):
+    """
+        Feed of the posts created, updated or deleted since a watermark, for incremental sync.
+    """
+    permission_classes = [IsAuthenticated]
+    default_limit = 100
+    max_limit = 1000
+
+    @extend_schema(
+        tags=["Post"],
+        summary="Retrieve post changes",
+        description="Get the posts created or updated, and the tombstones of posts deleted, after a watermark, oldest first. "
+                    "Start with `since` (or nothing for a full sync), then pass the returned `next_cursor` as `cursor` "
+                    "until `has_more` is false. Keep the last `next_cursor` to resume the next sync.",
+        responses={
+            200: OpenApiResponse(description='List of post changes'),
+            400: OpenApiResponse(description='Invalid watermark, cursor or limit'),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+        },
+        parameters=[
+            OpenApiParameter(name='since', type=str, description="ISO 8601 datetime; return changes made at or after it", required=False),
+            OpenApiParameter(name='cursor', type=str, description="Opaque cursor returned by the previous call (takes precedence over since)", required=False),
+            OpenApiParameter(name='limit', type=int, description="Maximum number of changes returned (default is 100, max is 1000)", required=False),
+            LIST_MODE_PARAMETER,
+        ]
+    )
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', self.default_limit)), 1), self.max_limit)
+
+            if request.query_params.get('cursor'):
+                position = decode_cursor(request.query_params['cursor'])
+            else:
+                since = request.query_params.get('since')
+                if since:
+                    since = parse_datetime(since)
+                    if since is None or since.tzinfo is None:
+                        raise ValueError("since must be an ISO 8601 datetime with a timezone")
+                position = since_position(since)
+
+        except ValueError as e:
+            return generate_response(status.HTTP_400_BAD_REQUEST, f"Invalid parameters: {str(e)}", None)
+
+        try:
+            posts = Post.objects.prefetch_related(
+                Prefetch('categories', queryset=PostCategory.objects.select_related('category')),
+                'tags',
+                'author'
+            )
+            posts, serializer_class = apply_list_mode(posts, request)
+
+            changes, last_position, has_more = get_post_changes(posts, position, limit)
+
+            upserted = [row for (_, kind, _), row in changes if kind == UPSERT]
+            serialized = iter(serializer_class(upserted, many=True).data)
+
+            data = []
+            for (timestamp, kind, _), row in changes:
+                if kind == UPSERT:
+                    data.append({'type': 'upsert', 'post': next(serialized)})
+                else:
+                    data.append({'type': 'delete', 'id': row.post_id, 'deleted_at': timestamp})
+
+            return generate_response(status.HTTP_200_OK, "Post changes retrieved successfully", {
+                'changes': data,
+                'next_cursor': encode_cursor(last_position),
+                'has_more': has_more,
+            })
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred while retrieving post changes: {str(e)}", None)
+
+
+
+class PostBatchView(APIView):
+    """
+        Retrieve several posts by ID in a constant number of queries.
+    """
+    permission_classes = [IsAuthenticated]
+    max_batch_size = 100
+
+    @extend_schema(
+        tags=["Post"],
+        summary="Retrieve posts by IDs",
+        description="Get several posts at once, in the requested order. IDs that do not match a post are reported in `missing`.",
+        responses={
+            200: OpenApiResponse(description='Requested posts and missing IDs'),
+            400: OpenApiResponse(description='Invalid or too many IDs'),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+        },
+        parameters=[
+            OpenApiParameter(name='ids', type=str, description="Comma separated post IDs (at most 100)", required=True),
+            LIST_MODE_PARAMETER,
+        ]
+    )
+    def get(self, request):
+        try:
+            post_ids = parse_id_list(request.query_params.get('ids'))
+        except ValueError:
+            return generate_response(status.HTTP_400_BAD_REQUEST, "ids must be comma separated integers", None)
+
+        return self.get_batch(request, post_ids)
+
+    @extend_schema(
+        tags=["Post"],
+        summary="Retrieve posts by IDs",
+        description="Same as the GET variant, with the IDs sent as `{\"ids\": [1, 2, 3]}` for long lists.",
+        request={'application/json': {'type': 'object', 'properties': {'ids': {'type': 'array', 'items': {'type': 'integer'}}}}},
+        responses={
+            200: OpenApiResponse(description='Requested posts and missing IDs'),
+            400: OpenApiResponse(description='Invalid or too many IDs'),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+        },
+        parameters=[LIST_MODE_PARAMETER]
+    )
+    def post(self, request):
+        post_ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(post_ids, list) or not all(isinstance(post_id, int) for post_id in post_ids):
+            return generate_response(status.HTTP_400_BAD_REQUEST, "ids must be a list of integers", None)
+
+        return self.get_batch(request, post_ids)
+
+    def get_batch(self, request, post_ids):
+        post_ids = list(dict.fromkeys(post_ids))
+
+        if not post_ids:
+            return generate_response(status.HTTP_400_BAD_REQUEST, "At least one id is required", None)
+        if len(post_ids) > self.max_batch_size:
+            return generate_response(status.HTTP_400_BAD_REQUEST, f"At most {self.max_batch_size} ids can be requested at once", None)
+
+        try:
+            posts = Post.objects.filter(id__in=post_ids).select_related('author').prefetch_related(
+                Prefetch('categories', queryset=PostCategory.objects.select_related('category')),
+                'tags'
+            )
+            posts, serializer_class = apply_list_mode(posts, request)
+
+            posts_by_id = {post.id: post for post in posts}
+            found = [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id]
+            missing = [post_id for post_id in post_ids if post_id not in posts_by_id]
+
+            serializer = serializer_class(found, many=True)
+            return generate_response(status.HTTP_200_OK, "Posts retrieved successfully", {
+                'results': serializer.data,
+                'missing': missing,
+            })
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred while retrieving posts: {str(e)}", None)
+
+
+
+class PostBatchOperationView(APIView):
+    """
+        Apply one change to many of the authenticated user's posts at once.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Post"],
+        summary="Update or delete posts in batch",
+        description="Apply an action to up to 100 posts: `set_status` (with `status`), `set_categories` (with `category_ids`), "
+                    "`add_tags` / `remove_tags` (with `tags`) or `delete`, in a single transaction. The result of each ID is one "
+                    "of updated, deleted or not_found. A batch naming posts of other users changes nothing and is rejected with 403, "
+                    "its results marking those posts forbidden and the user's own skipped.",
+        request=PostBatchOperationSerializer,
+        responses={
+            200: OpenApiResponse(description='Result of each requested ID'),
+            400: OpenApiResponse(description='Invalid data'),
+            403: OpenApiResponse(description='Forbidden: Authentication required, or some posts belong to other users'),
+        }
+    )
+    def post(self, request):
+        serializer = PostBatchOperationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            results = run_batch_operation(request.user, serializer.validated_data)
+            return generate_response(status.HTTP_200_OK, "Batch operation applied successfully", results)
+
+        except BatchOwnershipError as e:
+            return generate_response(status.HTTP_403_FORBIDDEN, "Some posts belong to other users, no post was changed", e.results)
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred while applying the batch operation: {str(e)}", None)
+
+
+
 class PostDetailView(APIView):
     """
-        View for retrieving and deleting a specific post by its ID.
+        View for retrieving, updating and deleting a specific post by its ID.
     """
     permission_classes = [IsAuthenticated]
 
@@ -239,8 +842,9 @@ class PostDetailView(APIView):
         try:
             post = Post.objects.prefetch_related('categories', 'tags', 'author').get(id=post_id)
             serializer = PostViewSerializer(post)
+            record_post_view(post.id)
 
-            return generate_response(status.HTTP_200_OK, "Post retrieved successfully", serializer.data)
+            return with_etag(generate_response(status.HTTP_200_OK, "Post retrieved successfully", serializer.data), post)
         
         except Post.DoesNotExist:
             return generate_response(status.HTTP_404_NOT_FOUND, "Post not found", None)
@@ -252,9 +856,10 @@ class PostDetailView(APIView):
     @extend_schema(
         tags=["Post"],
         summary="Delete a post",
-        description="Delete a post by ID. Users can only delete their own posts.",
+        description="Delete a post by ID. Users can only delete their own posts. "
+                    "The post is hidden right away and purged in the background; follow the returned deletion job for its progress.",
         responses={
-            204: OpenApiResponse(description='Post deleted successfully'),
+            202: OpenApiResponse(description='Post deletion scheduled', response=DeletionJobViewSerializer),
             403: OpenApiResponse(description='Forbidden: You are not authorized to delete this post'),
             404: OpenApiResponse(description='Post not found'),
         },
@@ -266,9 +871,9 @@ class PostDetailView(APIView):
             if post.author != request.user:
                 return generate_response(status.HTTP_403_FORBIDDEN, "You are not authorized to delete this post", None)
             
-            post.delete()
+            job = schedule_post_deletion(post, requested_by=request.user)
 
-            return generate_response(status.HTTP_200_OK, "Post deleted successfully", None)
+            return generate_response(status.HTTP_202_ACCEPTED, "Post deletion scheduled", DeletionJobViewSerializer(job).data)
 
         except Post.DoesNotExist:
             return generate_response(status.HTTP_404_NOT_FOUND, "Post not found", None)
@@ -299,7 +904,60 @@ class PostDetailView(APIView):
             updated_post = serializer.save()
 
             response_serializer = PostViewSerializer(updated_post)
-            return generate_response(status.HTTP_200_OK, "Post updated successfully", response_serializer.data)
+            return with_etag(generate_response(status.HTTP_200_OK, "Post updated successfully", response_serializer.data), updated_post)
+
+        except Post.DoesNotExist:
+            return generate_response(status.HTTP_404_NOT_FOUND, "Post not found", None)
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred while updating the post: {str(e)}", None)
+
+    @extend_schema(
+        tags=["Post"],
+        summary="Partially update a post",
+        description="Update some fields of a post by ID. Only the columns that changed are written, and tags or categories "
+                    "only when they are sent. Send the ETag of the post as If-Match (or its `version`) to reject the update "
+                    "with 412 when the post changed in the meantime. Users can only update their own posts.",
+        request=PostPartialUpdateSerializer,
+        parameters=[
+            OpenApiParameter(name='If-Match', type=str, location=OpenApiParameter.HEADER, description='ETag (version) the edit is based on', required=False),
+        ],
+        responses={
+            200: OpenApiResponse(description='Post updated successfully', response=PostViewSerializer),
+            400: OpenApiResponse(description='Invalid data'),
+            403: OpenApiResponse(description='Forbidden: You are not authorized to update this post'),
+            404: OpenApiResponse(description='Post not found'),
+            412: OpenApiResponse(description='The post changed since the given version'),
+        }
+    )
+    def patch(self, request, post_id):
+        try:
+            expected_version = parse_if_match(request)
+            if expected_version is None and isinstance(request.data, dict) and request.data.get('version') is not None:
+                expected_version = int(request.data['version'])
+        except (TypeError, ValueError):
+            return generate_response(status.HTTP_400_BAD_REQUEST, "If-Match and version must hold a post version", None)
+
+        try:
+            post = Post.objects.get(id=post_id)
+
+            if post.author != request.user:
+                return generate_response(status.HTTP_403_FORBIDDEN, "You are not authorized to update this post", None)
+
+            serializer = PostPartialUpdateSerializer(post, data=request.data, partial=True, context={'expected_version': expected_version})
+            if not serializer.is_valid():
+                return generate_response(status.HTTP_400_BAD_REQUEST, "Invalid data", serializer.errors)
+            serializer.save()
+
+            updated_post = Post.objects.select_related('author').prefetch_related(
+                Prefetch('categories', queryset=PostCategory.objects.select_related('category')),
+                'tags'
+            ).get(id=post_id)
+            response_serializer = PostViewSerializer(updated_post)
+            return with_etag(generate_response(status.HTTP_200_OK, "Post updated successfully", response_serializer.data), updated_post)
+
+        except PostVersionConflict:
+            return generate_response(status.HTTP_412_PRECONDITION_FAILED, "The post was modified since the given version", None)
 
         except Post.DoesNotExist:
             return generate_response(status.HTTP_404_NOT_FOUND, "Post not found", None)
@@ -309,4 +967,180 @@ class PostDetailView(APIView):
 
 
 
+class PostRelatedView(APIView):
+    """
+        Retrieve the posts most related to a post, precomputed by the build_related_posts command.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Post"],
+        summary="Retrieve related posts",
+        description="Get the posts sharing the most tags and categories with a post, most related first. "
+                    "They are recomputed in the background, so a new or edited post may have none for a while.",
+        responses={
+            200: OpenApiResponse(description='Related posts', response=RelatedPostViewSerializer(many=True)),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+            404: OpenApiResponse(description='Post not found'),
+        }
+    )
+    def get(self, request, post_id):
+        try:
+            related = list(RelatedPost.objects.filter(post_id=post_id, related__pending_deletion=False).select_related('related').only(
+                'score', 'related__id', 'related__title', 'related__excerpt', 'related__reading_time'
+            ).order_by('rank'))
+
+            if not related and not Post.objects.filter(id=post_id).exists():
+                return generate_response(status.HTTP_404_NOT_FOUND, "Post not found", None)
+
+            return generate_response(status.HTTP_200_OK, "Related posts retrieved successfully", RelatedPostViewSerializer(related, many=True).data)
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred while retrieving related posts: {str(e)}", None)
+
+
+
+class PopularPostsView(APIView):
+    """
+        Retrieve the most viewed posts of the last day or week.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Post"],
+        summary="Retrieve popular posts",
+        description="Get the most viewed posts over a window, most viewed first. "
+                    "Views are written in batches, so the ranking lags a little behind the latest views.",
+        responses={
+            200: OpenApiResponse(description='Popular posts', response=PopularPostViewSerializer(many=True)),
+            400: OpenApiResponse(description='Invalid window or limit'),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+        },
+        parameters=[
+            OpenApiParameter(name='window', type=str, enum=list(RANKING_WINDOWS), description="Period the views are counted over (default is day)"),
+            OpenApiParameter(name='limit', type=int, description="Maximum number of posts returned (default is 10, max is 100)"),
+        ]
+    )
+    def get(self, request):
+        try:
+            window = request.query_params.get('window', 'day')
+            if window not in RANKING_WINDOWS:
+                return generate_response(status.HTTP_400_BAD_REQUEST, f"window must be one of: {', '.join(RANKING_WINDOWS)}", None)
+
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+
+            ranking = get_ranking(window)[:limit]
+            posts = Post.objects.only('id', 'title', 'excerpt', 'reading_time').in_bulk([post_id for post_id, _ in ranking])
+            # Posts hidden since the ranking was computed are left out.
+            popular = [{'post': posts[post_id], 'views': views} for post_id, views in ranking if post_id in posts]
+
+            return generate_response(status.HTTP_200_OK, "Popular posts retrieved successfully", PopularPostViewSerializer(popular, many=True).data)
+
+        except ValueError:
+            return generate_response(status.HTTP_400_BAD_REQUEST, "limit must be an integer", None)
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred while retrieving popular posts: {str(e)}", None)
+
+
+
+class DeletionJobDetailView(APIView):
+    """
+        Follow the progress of a background deletion.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Deletion Job"],
+        summary="Retrieve a deletion job",
+        description="Get the status and progress of a user or post deletion. Only the requester and staff can see a job.",
+        responses={
+            200: OpenApiResponse(description='Deletion job retrieved successfully', response=DeletionJobViewSerializer),
+            403: OpenApiResponse(description='Forbidden: Authentication required'),
+            404: OpenApiResponse(description='Deletion job not found'),
+        }
+    )
+    def get(self, request, job_id):
+        try:
+            job = DeletionJob.objects.get(id=job_id)
+
+            if not request.user.is_staff and job.requested_by_id != request.user.id:
+                return generate_response(status.HTTP_404_NOT_FOUND, "Deletion job not found", None)
+
+            return generate_response(status.HTTP_200_OK, "Deletion job retrieved successfully", DeletionJobViewSerializer(job).data)
+
+        except DeletionJob.DoesNotExist:
+            return generate_response(status.HTTP_404_NOT_FOUND, "Deletion job not found", None)
+
+        except Exception as e:
+            return generate_response(status.HTTP_500_INTERNAL_SERVER_ERROR, f"An error occurred while retrieving the deletion job: {str(e)}", None)
+
+
+
+async def get_stream_user(request):
+    """
+        Return the user of a session, or of HTTP Basic credentials verified on the hashing executor, or None.
+        Requests whose middleware profile skips authentication (see MIDDLEWARE_PROFILES) have no session user.
+    """
+    auser = getattr(request, 'auser', None)
+    if auser is not None:
+        user = await auser()
+        if user.is_authenticated:
+            return user
+
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'basic':
+        return None
+
+    try:
+        username, _, password = base64.b64decode(credentials).decode().partition(':')
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+
+    return await aauthenticate_user(username, password)
+
+
+class PostEventsStreamView(View):
+    """
+        Server-Sent Events stream of post created/updated/deleted events.
+        Each connection waits on an asyncio queue, so it must be served through ASGI (config.asgi).
+    """
+    heartbeat_seconds = 15
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return generate_json_response(status.HTTP_501_NOT_IMPLEMENTED, "The event stream is only served through ASGI")
+
+        try:
+            user = await get_stream_user(request)
+        except HashingBusy as e:
+            return generate_json_response(status.HTTP_503_SERVICE_UNAVAILABLE, str(e), headers={'Retry-After': '1'})
+
+        if user is None:
+            return generate_json_response(status.HTTP_403_FORBIDDEN, "Authentication credentials were not provided.")
+
+        try:
+            authors = parse_id_list(request.GET.get('author'))
+            categories = parse_id_list(request.GET.get('category'))
+        except ValueError:
+            return generate_json_response(status.HTTP_400_BAD_REQUEST, "author and category must be comma separated ids")
+
+        subscriber = broadcaster.subscribe(asyncio.get_running_loop(), authors, categories)
+
+        async def stream():
+            try:
+                yield "retry: 3000\n\n"
+                while True:
+                    try:
+                        event = await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat_seconds)
+                    except asyncio.TimeoutError:
+                        yield ": keepalive\n\n"
+                        continue
+                    yield format_event(event)
+            finally:
+                broadcaster.unsubscribe(subscriber)
 
+        response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
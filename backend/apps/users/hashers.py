@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+
+
+def get_work_factor(name, default):
+    """
+        Return a work factor from AUTH_HASHING_SETTINGS, falling back to Django's default.
+    """
+    return getattr(settings, 'AUTH_HASHING_SETTINGS', {}).get(name, default)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+        PBKDF2 hasher whose iteration count is configured in AUTH_HASHING_SETTINGS.
+        It keeps the `pbkdf2_sha256` algorithm name, so existing hashes still verify
+        and are upgraded on login when the iteration count changes.
+    """
+
+    @property
+    def iterations(self):
+        return get_work_factor('PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+        Argon2 hasher whose time cost, memory cost and parallelism are configured in AUTH_HASHING_SETTINGS.
+        Requires the `argon2-cffi` package.
+    """
+
+    @property
+    def time_cost(self):
+        return get_work_factor('ARGON2_TIME_COST', Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return get_work_factor('ARGON2_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return get_work_factor('ARGON2_PARALLELISM', Argon2PasswordHasher.parallelism)
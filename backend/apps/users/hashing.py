@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.db import close_old_connections
+
+
+class HashingBusy(Exception):
+    """
+        Raised when every slot of the hashing queue is taken.
+    """
+
+
+_lock = threading.Lock()
+_executor = None
+_slots = None
+
+
+def get_executor():
+    """
+        Return the dedicated hashing executor and its queue slots, creating them on first use.
+        PBKDF2 (hashlib) and Argon2 (argon2-cffi) release the GIL, so a thread pool spreads hashing over cores.
+    """
+    global _executor, _slots
+
+    with _lock:
+        if _executor is None:
+            config = getattr(settings, 'AUTH_HASHING_SETTINGS', {})
+            _executor = ThreadPoolExecutor(max_workers=config.get('WORKERS', 2), thread_name_prefix='auth-hashing')
+            _slots = threading.BoundedSemaphore(config.get('QUEUE_SIZE', 32))
+
+    return _executor, _slots
+
+
+def submit(fn, *args, **kwargs):
+    """
+        Run a hashing function on the dedicated executor and return its future.
+        Raises HashingBusy instead of queueing when the executor already holds QUEUE_SIZE tasks.
+    """
+    executor, slots = get_executor()
+    if not slots.acquire(blocking=False):
+        raise HashingBusy("Too many password operations in progress, retry later.")
+
+    try:
+        future = executor.submit(fn, *args, **kwargs)
+    except BaseException:
+        slots.release()
+        raise
+
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def _authenticate(username, password):
+    """
+        Authenticate on an executor thread, recycling its database connection like a request would.
+    """
+    close_old_connections()
+    try:
+        return authenticate(username=username, password=password)
+    finally:
+        close_old_connections()
+
+
+def authenticate_user(username, password):
+    """
+        Verify credentials on the hashing executor and return the user, or None.
+    """
+    return submit(_authenticate, username, password).result()
+
+
+def hash_password(password):
+    """
+        Hash a raw password on the hashing executor.
+    """
+    return submit(make_password, password).result()
+
+
+async def aauthenticate_user(username, password):
+    """
+        Awaitable variant of authenticate_user for async views, leaving the event loop free while hashing.
+    """
+    return await asyncio.wrap_future(submit(_authenticate, username, password))
+
+
+async def ahash_password(password):
+    """
+        Awaitable variant of hash_password for async views.
+    """
+    return await asyncio.wrap_future(submit(make_password, password))
@@ -0,0 +1,118 @@
+import statistics
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from apps.users.hashing import hash_password
+from apps.users.models import User
+
+
+def percentile(values, fraction):
+    """
+        Return the value below which the given fraction of the sorted values fall.
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = ("Run a login storm against the in-process API and report login throughput "
+            "and the latency of a cheap endpoint (/api/v1/me) before and during the storm.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200, help="Total number of logins")
+        parser.add_argument('--concurrency', type=int, default=16, help="Number of threads logging in concurrently")
+        parser.add_argument('--probes', type=int, default=50, help="Number of baseline requests to the cheap endpoint")
+
+    def handle(self, *args, **options):
+        suffix = uuid.uuid4().hex[:8]
+        password = uuid.uuid4().hex
+        storm_user = User(username=f'bench-{suffix}', email=f'bench-{suffix}@example.com', first_name='Bench', last_name='Storm', password=hash_password(password))
+        storm_user.save()
+        probe_user = User.objects.create_user(f'probe-{suffix}', f'probe-{suffix}@example.com', None, first_name='Bench', last_name='Probe')
+
+        setup_test_environment()
+        try:
+            probe_client = Client()
+            probe_client.force_login(probe_user)
+
+            baseline = [self.probe(probe_client) for _ in range(options['probes'])]
+
+            storm = self.run_storm(storm_user.username, password, options['logins'], options['concurrency'], probe_client)
+        finally:
+            teardown_test_environment()
+            User.objects.filter(id__in=[storm_user.id, probe_user.id]).delete()
+
+        self.report("Cheap endpoint before the storm", baseline)
+        self.report("Cheap endpoint during the storm", storm['probes'])
+        self.report("Logins", storm['logins'])
+        self.stdout.write(
+            f"Login throughput: {storm['succeeded'] / storm['elapsed']:.1f} logins/s "
+            f"({storm['succeeded']} succeeded, {storm['rejected']} rejected with 503, {storm['elapsed']:.2f}s)"
+        )
+
+    def probe(self, client):
+        started = time.perf_counter()
+        client.get('/api/v1/me')
+        return time.perf_counter() - started
+
+    def run_storm(self, username, password, total, concurrency, probe_client):
+        remaining = iter(range(total))
+        lock = threading.Lock()
+        done = threading.Event()
+        logins, probes, statuses = [], [], []
+
+        def login_worker():
+            client = Client()
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                started = time.perf_counter()
+                response = client.post('/api/v1/login', {'username': username, 'password': password}, content_type='application/json')
+                with lock:
+                    logins.append(time.perf_counter() - started)
+                    statuses.append(response.status_code)
+
+        def probe_worker():
+            while not done.is_set():
+                probes.append(self.probe(probe_client))
+
+        workers = [threading.Thread(target=login_worker) for _ in range(concurrency)]
+        prober = threading.Thread(target=probe_worker)
+
+        started = time.perf_counter()
+        prober.start()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        done.set()
+        prober.join()
+
+        return {
+            'logins': logins,
+            'probes': probes,
+            'elapsed': elapsed,
+            'succeeded': statuses.count(200),
+            'rejected': statuses.count(503),
+        }
+
+    def report(self, label, latencies):
+        if not latencies:
+            self.stdout.write(f"{label}: no samples")
+            return
+
+        self.stdout.write(
+            f"{label}: {len(latencies)} requests, "
+            f"p50 {statistics.median(latencies) * 1000:.1f} ms, "
+            f"p95 {percentile(latencies, 0.95) * 1000:.1f} ms, "
+            f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms"
+        )
@@ -0,0 +1,34 @@
+import csv
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.utils import get_import_workers, import_users
+
+
+class Command(BaseCommand):
+    help = "Create users in bulk from a CSV (username,email,first_name,last_name,password header) or JSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path of the .csv or .json file to import")
+        parser.add_argument('--workers', type=int, default=None, help="Number of password hashing processes (default: USER_IMPORT_WORKERS, else every CPU core)")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Number of users inserted per query")
+
+    def handle(self, *args, **options):
+        path = options['path']
+
+        try:
+            with open(path, newline='', encoding='utf-8') as file:
+                rows = json.load(file) if path.endswith('.json') else list(csv.DictReader(file))
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Unable to read {path}: {e}")
+
+        result = import_users(rows, workers=get_import_workers(options['workers']), batch_size=options['batch_size'])
+
+        for error in result['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']}/{result['total']} users in {result['elapsed_seconds']}s "
+            f"({result['users_per_second']} users/s, hashing {result['hashing_seconds']}s), {result['failed']} failed"
+        ))
@@ -1,8 +1,16 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
+from django.contrib.postgres.indexes import OpClass
+from django.db.models.functions import Upper
 from django.db import models
 
 
 class UserManager(BaseUserManager):
+    def get_queryset(self):
+        """
+            Hide users waiting for background deletion.
+        """
+        return super().get_queryset().filter(pending_deletion=False)
+
     def create_user(self, username, email, password=None, **extra_fields):
         """
             Creates and returns a user with an email and password.
@@ -34,17 +42,25 @@ class User(AbstractBaseUser):
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    pending_deletion = models.BooleanField(default=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     objects = UserManager()
+    all_objects = models.Manager()
 
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['email']
 
     class Meta:
         db_table = 'users' 
+        indexes = [
+            models.Index(OpClass(Upper('username'), name='text_pattern_ops'), name='users_username_prefix_idx'),
+            models.Index(OpClass(Upper('email'), name='text_pattern_ops'), name='users_email_prefix_idx'),
+            models.Index(OpClass(Upper('first_name'), name='text_pattern_ops'), name='users_first_name_prefix_idx'),
+            models.Index(OpClass(Upper('last_name'), name='text_pattern_ops'), name='users_last_name_prefix_idx'),
+        ]
 
     def __str__(self):
         """
@@ -1,7 +1,7 @@
 from rest_framework import serializers
-from django.contrib.auth import authenticate
 from django.core.exceptions import ValidationError
 
+from apps.users.hashing import authenticate_user, hash_password
 from apps.users.models import User
 
 
@@ -19,13 +19,14 @@ class UserCreateSerializer(serializers.ModelSerializer):
         """
             Create and return a new user instance.
         """
-        user = User.objects.create_user(
+        user = User(
             username=validated_data['username'],
-            email=validated_data['email'],
-            password=validated_data['password'],
+            email=User.objects.normalize_email(validated_data['email']),
+            password=hash_password(validated_data['password']),
             first_name=validated_data['first_name'],
             last_name=validated_data['last_name']
         )
+        user.save()
         return user
 
 
@@ -67,7 +68,7 @@ class LoginSerializer(serializers.Serializer):
         """
             Validate user credentials.
         """
-        user = authenticate(username=data['username'], password=data['password'])
+        user = authenticate_user(data['username'], data['password'])
         if user is None:
             raise serializers.ValidationError("Invalid credentials")
         return user
@@ -81,3 +82,16 @@ class UserViewSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name')
+
+
+class UserImportSerializer(serializers.Serializer):
+    """
+        Serializer validating a single row of a bulk user import.
+        Uniqueness is checked for the whole import at once, not per row.
+    """
+
+    username = serializers.CharField(max_length=50)
+    email = serializers.EmailField(max_length=50)
+    first_name = serializers.CharField(max_length=50)
+    last_name = serializers.CharField(max_length=50)
+    password = serializers.CharField(write_only=True)
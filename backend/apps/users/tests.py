@@ -1 +1,35 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.users.models import User
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], USER_IMPORT_MAX_ROWS=3)
+class UsersImportViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('admin', 'admin@example.com', 'pw', is_staff=True))
+
+    def rows(self, count):
+        return [
+            {'username': f'user{i}', 'email': f'user{i}@example.com', 'first_name': 'U', 'last_name': str(i), 'password': 'Secret-pass-1'}
+            for i in range(count)
+        ]
+
+    def test_imports_without_a_process_pool(self):
+        with mock.patch('apps.users.utils.ProcessPoolExecutor') as pool:
+            response = self.client.post('/api/v1/users/import', self.rows(3), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['created'], 3)
+        pool.assert_not_called()
+        self.assertTrue(User.objects.get(username='user2').check_password('Secret-pass-1'))
+
+    def test_rejects_more_rows_than_the_limit(self):
+        response = self.client.post('/api/v1/users/import', self.rows(4), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertFalse(User.objects.filter(username__startswith='user').exists())
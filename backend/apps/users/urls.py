@@ -1,7 +1,7 @@
 from django.urls import path
 
 from apps.users.viewsAuth import LoginView, RegisterView, UserProfileView
-from apps.users.viewsUserManagment import UsersListView, UserDetailView
+from apps.users.viewsUserManagment import UsersListView, UsersExportView, UsersImportView, UserDetailView
 
 urlpatterns = [
     path('login', LoginView.as_view(), name='login'),
@@ -9,6 +9,8 @@ urlpatterns = [
     path('me', UserProfileView.as_view(), name='user-profile'),
 
     path('users', UsersListView.as_view(), name='users-list'),
+    path('users/export', UsersExportView.as_view(), name='users-export'),
+    path('users/import', UsersImportView.as_view(), name='users-import'),
     path('users/<int:id>', UserDetailView.as_view(), name='user-detail'),
     
 ]
@@ -0,0 +1,121 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+
+from apps.users.models import User
+from apps.users.serializers import UserImportSerializer
+
+
+def get_import_workers(workers=None):
+    """
+        Number of hashing processes for an offline import: `workers`, else USER_IMPORT_WORKERS, else every CPU core.
+    """
+    return workers or getattr(settings, 'USER_IMPORT_WORKERS', None) or os.cpu_count() or 1
+
+
+def hash_passwords(passwords, workers=1):
+    """
+        Hash passwords, preserving their order, across a pool of `workers` processes when there are more than one.
+        Hashing is CPU bound, so threads would serialize on the GIL. Starting the pool forks the calling process,
+        so only the import_users command uses one; requests hash in their own thread.
+    """
+    if workers == 1 or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+def import_users(rows, workers=1, batch_size=1000):
+    """
+        Validate and create users in bulk, hashing passwords across `workers` processes (see hash_passwords).
+        Returns the number of created users, per-row errors (1-based row numbers) and throughput numbers.
+    """
+    started = time.perf_counter()
+    rows = list(rows)
+    errors = []
+    valid = []
+
+    for number, row in enumerate(rows, start=1):
+        serializer = UserImportSerializer(data=row)
+        if serializer.is_valid():
+            data = serializer.validated_data
+            data['email'] = User.objects.normalize_email(data['email'])
+            valid.append((number, data))
+        else:
+            errors.append({'row': number, 'errors': serializer.errors})
+
+    valid = check_unique_users(valid, errors)
+
+    hashing_started = time.perf_counter()
+    passwords = hash_passwords([data['password'] for _, data in valid], workers)
+    hashing_seconds = time.perf_counter() - hashing_started
+
+    created = 0
+    for start in range(0, len(valid), batch_size):
+        batch = valid[start:start + batch_size]
+        users = [
+            User(
+                username=data['username'],
+                email=data['email'],
+                first_name=data['first_name'],
+                last_name=data['last_name'],
+                password=password,
+            )
+            for (_, data), password in zip(batch, passwords[start:start + batch_size])
+        ]
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+            created += len(users)
+        except IntegrityError as e:
+            errors.extend({'row': number, 'errors': {'non_field_errors': [str(e)]}} for number, _ in batch)
+
+    elapsed = time.perf_counter() - started
+    errors.sort(key=lambda error: error['row'])
+
+    return {
+        'total': len(rows),
+        'created': created,
+        'failed': len(errors),
+        'errors': errors,
+        'elapsed_seconds': round(elapsed, 3),
+        'hashing_seconds': round(hashing_seconds, 3),
+        'users_per_second': round(created / elapsed, 1) if elapsed else None,
+    }
+
+
+def check_unique_users(valid, errors):
+    """
+        Drop rows whose username or email is already taken, either in the database or by an earlier row.
+        Existing values are fetched with one query per field.
+    """
+    usernames = {data['username'] for _, data in valid}
+    emails = {data['email'] for _, data in valid}
+    taken_usernames = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    taken_emails = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+
+    unique = []
+    for number, data in valid:
+        row_errors = {}
+        if data['username'] in taken_usernames:
+            row_errors['username'] = ["This username is already in use by another user."]
+        if data['email'] in taken_emails:
+            row_errors['email'] = ["This email is already in use by another user."]
+
+        if row_errors:
+            errors.append({'row': number, 'errors': row_errors})
+            continue
+
+        taken_usernames.add(data['username'])
+        taken_emails.add(data['email'])
+        unique.append((number, data))
+
+    return unique
@@ -7,6 +7,18 @@ from rest_framework import status
 from datetime import datetime
 
 from apps.users.serializers import UserCreateSerializer, LoginSerializer, UserViewSerializer
+from apps.users.hashing import HashingBusy
+
+
+def hashing_busy_response(error):
+    """
+        Response returned when the password hashing queue is full.
+    """
+    return Response({
+        "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+        "message": str(error),
+        "timestamp": datetime.now(),
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
 
 
 class LoginView(APIView):
@@ -22,7 +34,8 @@ class LoginView(APIView):
         request=LoginSerializer,
         responses={
             200: OpenApiResponse(description='Login successful', response=UserViewSerializer),
-            400: OpenApiResponse(description='Invalid credentials')
+            400: OpenApiResponse(description='Invalid credentials'),
+            503: OpenApiResponse(description='Too many logins in progress, retry later'),
         })
     def post(self, request):
         try:
@@ -42,6 +55,9 @@ class LoginView(APIView):
                 "timestamp": datetime.now(),
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        except HashingBusy as e:
+            return hashing_busy_response(e)
+
         except Exception as e:
             return Response({
                 "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -65,7 +81,8 @@ class RegisterView(APIView):
         request=UserCreateSerializer,
         responses={
             201: OpenApiResponse(description='User successfully registered'),
-            400: OpenApiResponse(description='Registration failed')
+            400: OpenApiResponse(description='Registration failed'),
+            503: OpenApiResponse(description='Too many registrations in progress, retry later'),
         })
     def post(self, request):
         try:
@@ -86,6 +103,9 @@ class RegisterView(APIView):
                 "data": user_created.errors
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        except HashingBusy as e:
+            return hashing_busy_response(e)
+
         except Exception as e:
             return Response({
                 "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
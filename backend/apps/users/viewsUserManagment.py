@@ -1,40 +1,70 @@
-from drf_spectacular.utils import extend_schema, OpenApiResponse
-from rest_framework.permissions import IsAuthenticated
+from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParameter
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.db.models import Q
 from datetime import datetime
+import csv
 
-from apps.users.serializers import UserViewSerializer, UserUpdateSerializer
+from apps.users.serializers import UserViewSerializer, UserUpdateSerializer, UserImportSerializer
+from apps.users.utils import import_users
 from apps.users.models import User
+from apps.blog.serializers import DeletionJobViewSerializer
+from apps.blog.jobs import schedule_user_deletion
 
 
 class UsersListView(APIView):
     """
-        Retrieve a list of all users.
+        Retrieve a keyset-paginated list of users, optionally filtered by a search prefix.
     """
     permission_classes = [IsAuthenticated]
+    default_limit = 100
+    max_limit = 1000
 
     @extend_schema(
         tags=["User Management"],
         summary="Retrieve all users",
-        description="Get a list of all registered users.",
+        description="Get a list of registered users ordered by ID. When more users are available, "
+                    "`next_cursor` holds the value to pass as `after` to fetch the next page.",
+        parameters=[
+            OpenApiParameter(name='search', type=str, description="Prefix matched against username, email, first name and last name", required=False),
+            OpenApiParameter(name='after', type=int, description="Return users with an ID greater than this cursor", required=False),
+            OpenApiParameter(name='limit', type=int, description="Number of users per page (default is 100, max is 1000)", required=False),
+        ],
         responses={
             200: OpenApiResponse(description='List of all users', response=UserViewSerializer(many=True)),
+            400: OpenApiResponse(description='Invalid pagination parameters'),
             403: OpenApiResponse(description='Forbidden: Authentication required'),
         }
     )
     def get(self, request):
         try:
-            users = User.objects.all()
-            serializer = UserViewSerializer(users, many=True)
+            after = int(request.query_params.get('after', 0))
+            limit = min(max(int(request.query_params.get('limit', self.default_limit)), 1), self.max_limit)
+        except ValueError:
             return Response({
+                "status_code": status.HTTP_400_BAD_REQUEST,
+                "message": "after and limit must be integers.",
+                "timestamp": datetime.now(),
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            users = list(search_users(request.query_params.get('search')).filter(id__gt=after).order_by('id')[:limit + 1])
+            serializer = UserViewSerializer(users[:limit], many=True)
+
+            response = {
                 "status_code": status.HTTP_200_OK,
                 "message": "Users retrieved successfully",
                 "timestamp": datetime.now(),
                 "data": serializer.data
-            }, status=status.HTTP_200_OK)
+            }
+            if len(users) > limit:
+                response["next_cursor"] = users[limit - 1].id
+
+            return Response(response, status=status.HTTP_200_OK)
 
         except Exception as e:
             return Response({
@@ -46,6 +76,125 @@ class UsersListView(APIView):
 
 
 
+class UsersExportView(APIView):
+    """
+        Stream every user as CSV, for admin tooling.
+    """
+    permission_classes = [IsAdminUser]
+    fields = ('id', 'username', 'email', 'first_name', 'last_name', 'is_active', 'is_staff', 'created_at')
+
+    @extend_schema(
+        tags=["User Management"],
+        summary="Export users",
+        description="Stream all users (optionally filtered by a search prefix) as a CSV file. Admin only.",
+        parameters=[
+            OpenApiParameter(name='search', type=str, description="Prefix matched against username, email, first name and last name", required=False),
+        ],
+        responses={
+            200: OpenApiResponse(description='CSV export of users'),
+            403: OpenApiResponse(description='Forbidden: Admin access required'),
+        }
+    )
+    def get(self, request):
+        rows = search_users(request.query_params.get('search')).order_by('id').values_list(*self.fields).iterator(chunk_size=2000)
+        writer = csv.writer(EchoBuffer())
+
+        def stream():
+            yield writer.writerow(self.fields)
+            for row in rows:
+                yield writer.writerow(row)
+
+        response = StreamingHttpResponse(stream(), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="users.csv"'
+        return response
+
+
+
+class UsersImportView(APIView):
+    """
+        Create users in bulk, for onboarding whole organizations.
+    """
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        tags=["User Management"],
+        summary="Import users",
+        description="Create users in bulk from a list of at most USER_IMPORT_MAX_ROWS users. Usernames and emails "
+                    "are checked for uniqueness in bulk and rows are inserted in batches. Invalid rows are reported "
+                    "without preventing the valid ones from being created. Larger imports go through the "
+                    "`import_users` command, which hashes passwords in parallel. Admin only.",
+        request=UserImportSerializer(many=True),
+        responses={
+            200: OpenApiResponse(description='Import report with per-row errors and throughput'),
+            400: OpenApiResponse(description='The request body is not a list of users'),
+            403: OpenApiResponse(description='Forbidden: Admin access required'),
+            413: OpenApiResponse(description='More users than USER_IMPORT_MAX_ROWS'),
+        }
+    )
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response({
+                "status_code": status.HTTP_400_BAD_REQUEST,
+                "message": "The request body must be a list of users.",
+                "timestamp": datetime.now(),
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        max_rows = getattr(settings, 'USER_IMPORT_MAX_ROWS', 100)
+        if len(request.data) > max_rows:
+            return Response({
+                "status_code": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                "message": f"At most {max_rows} users can be imported per request, use the import_users command for more.",
+                "timestamp": datetime.now(),
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        try:
+            result = import_users(request.data)
+            return Response({
+                "status_code": status.HTTP_200_OK,
+                "message": f"{result['created']} of {result['total']} users imported",
+                "timestamp": datetime.now(),
+                "data": result
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return Response({
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "An error occurred while importing users.",
+                "timestamp": datetime.now(),
+                "error": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+
+class EchoBuffer:
+    """
+        File-like object handing each written CSV row straight back to the streaming response.
+    """
+
+    def write(self, value):
+        return value
+
+
+def search_users(search_term):
+    """
+        Return users whose username, email, first name or last name starts with the search term.
+        Prefix matching keeps the lookup on the upper-cased prefix indexes of the users table.
+    """
+    users = User.objects.all()
+
+    if search_term and search_term.strip():
+        search_term = search_term.strip()
+        users = users.filter(
+            Q(username__istartswith=search_term) |
+            Q(email__istartswith=search_term) |
+            Q(first_name__istartswith=search_term) |
+            Q(last_name__istartswith=search_term)
+        )
+
+    return users
+
+
+
 class UserDetailView(APIView):
     """
         View, Update, Delete a user.
@@ -92,9 +241,10 @@ class UserDetailView(APIView):
     @extend_schema(
         tags=["User Management"],
         summary="Delete a user",
-        description="Delete a specific user by their ID.",
+        description="Delete a specific user by their ID. The user and their posts are hidden right away and purged in the background; "
+                    "follow the returned deletion job for its progress.",
         responses={
-            200: OpenApiResponse(description='User deleted successfully'),
+            202: OpenApiResponse(description='User deletion scheduled', response=DeletionJobViewSerializer),
             404: OpenApiResponse(description='User not found'),
             403: OpenApiResponse(description='Forbidden: Authentication required'),
         }
@@ -102,12 +252,13 @@ class UserDetailView(APIView):
     def delete(self, request, id):
         try:
             user = User.objects.get(id=id)
-            user.delete()
+            job = schedule_user_deletion(user, requested_by=request.user)
             return Response({
-                "status_code": status.HTTP_200_OK,
-                "message": "User deleted successfully",
+                "status_code": status.HTTP_202_ACCEPTED,
+                "message": "User deletion scheduled",
                 "timestamp": datetime.now(),
-            }, status=status.HTTP_200_OK)
+                "data": DeletionJobViewSerializer(job).data
+            }, status=status.HTTP_202_ACCEPTED)
 
         except User.DoesNotExist:
             return Response({
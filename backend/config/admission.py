@@ -0,0 +1,231 @@
+import re
+import threading
+import time
+
+from django.conf import settings
+from rest_framework import status
+
+from config.response import generate_json_response
+
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'PER_CLIENT_CONCURRENCY': 8,
+    'RETRY_AFTER_SECONDS': 1,
+    'TRUST_X_FORWARDED_FOR': False,
+    'COST_CLASSES': {
+        'default': {'CONCURRENCY': 64, 'MAX_QUEUE_MS': 2000},
+    },
+    'ROUTES': [],
+    'EXEMPT': [],
+}
+
+
+def get_admission_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'ADMISSION_CONTROL', {})}
+
+
+class CostClass:
+    """
+        A group of routes sharing a number of concurrent slots. A request waits for a free slot
+        at most `max_queue_ms`; past that it is shed, since its client has likely given up already.
+    """
+
+    # Weight of the latest admission in the moving average of the queue time
+    EWMA_WEIGHT = 0.2
+
+    def __init__(self, name, concurrency, max_queue_ms):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue_ms / 1000
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self.queue_ms_avg = 0.0
+        self.queue_ms_max = 0.0
+
+    def acquire(self):
+        """
+            Wait for a slot. Return True once admitted, False when the queue time budget ran out.
+        """
+        with self.lock:
+            self.waiting += 1
+
+        started = time.perf_counter()
+        admitted = self.slots.acquire(timeout=self.max_queue)
+        queue_ms = (time.perf_counter() - started) * 1000
+
+        with self.lock:
+            self.waiting -= 1
+            if not admitted:
+                self.shed += 1
+                return False
+            self.in_flight += 1
+            self.admitted += 1
+            self.queue_ms_avg += self.EWMA_WEIGHT * (queue_ms - self.queue_ms_avg)
+            self.queue_ms_max = max(self.queue_ms_max, queue_ms)
+        return True
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+        self.slots.release()
+
+    def metrics(self):
+        with self.lock:
+            return {
+                'concurrency': self.concurrency,
+                'max_queue_ms': self.max_queue * 1000,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'shed': self.shed,
+                'queue_ms_avg': round(self.queue_ms_avg, 2),
+                'queue_ms_max': round(self.queue_ms_max, 2),
+            }
+
+
+class ClientLimiter:
+    """
+        Caps the number of requests a single user or IP address has in flight, across every route.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.rejected = 0
+
+    def acquire(self, client):
+        with self.lock:
+            if self.in_flight.get(client, 0) >= self.limit:
+                self.rejected += 1
+                return False
+            self.in_flight[client] = self.in_flight.get(client, 0) + 1
+        return True
+
+    def release(self, client):
+        with self.lock:
+            if self.in_flight[client] > 1:
+                self.in_flight[client] -= 1
+            else:
+                del self.in_flight[client]
+
+    def metrics(self):
+        with self.lock:
+            return {
+                'limit': self.limit,
+                'active_clients': len(self.in_flight),
+                'rejected': self.rejected,
+            }
+
+
+class AdmissionController:
+    """
+        The cost classes and client limits of this process, built from the ADMISSION_CONTROL setting.
+        Limits apply per process: a server running N workers admits N times as many requests.
+    """
+
+    def __init__(self, config):
+        self.enabled = config['ENABLED']
+        self.retry_after = str(config['RETRY_AFTER_SECONDS'])
+        self.trust_forwarded_for = config['TRUST_X_FORWARDED_FOR']
+        self.classes = {
+            name: CostClass(name, cost_class['CONCURRENCY'], cost_class['MAX_QUEUE_MS'])
+            for name, cost_class in config['COST_CLASSES'].items()
+        }
+        self.routes = [(method, re.compile(pattern), name) for method, pattern, name in config['ROUTES']]
+        self.exempt = [re.compile(pattern) for pattern in config['EXEMPT']]
+        self.clients = ClientLimiter(config['PER_CLIENT_CONCURRENCY'])
+
+    def get_cost_class(self, request):
+        """
+            Return the cost class of a request, or None when the route is exempt from admission control.
+        """
+        if any(pattern.match(request.path) for pattern in self.exempt):
+            return None
+        for method, pattern, name in self.routes:
+            if method in ('*', request.method) and pattern.match(request.path):
+                return self.classes[name]
+        return self.classes['default']
+
+    def get_client(self, request):
+        """
+            Identify who a request counts against: its session user, or else its IP address.
+            Basic credentials are not verified before the view runs, so the username they carry does not pick
+            the key: a made-up one would escape the IP cap, and another user's would take up that user's slots.
+            Routes whose middleware profile leaves out sessions have no session user.
+        """
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'user:{user.pk}'
+
+        if self.trust_forwarded_for and 'HTTP_X_FORWARDED_FOR' in request.META:
+            return 'ip:' + request.META['HTTP_X_FORWARDED_FOR'].split(',')[0].strip()
+        return 'ip:' + request.META.get('REMOTE_ADDR', '')
+
+    def metrics(self):
+        return {
+            'enabled': self.enabled,
+            'cost_classes': {name: cost_class.metrics() for name, cost_class in self.classes.items()},
+            'clients': self.clients.metrics(),
+        }
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_controller():
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController(get_admission_settings())
+    return _controller
+
+
+class AdmissionControlMiddleware:
+    """
+        Admit each request into its cost class, within its client's concurrency cap.
+
+        A client over its cap is rejected with 429 right away; a request that waited too long
+        for a slot of its cost class is shed with 503. Both carry a Retry-After header,
+        so expensive routes under a spike degrade on their own instead of timing out every other route.
+        Must come after AuthenticationMiddleware, which resolves the session user where it runs.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.controller = get_controller()
+
+    def __call__(self, request):
+        controller = self.controller
+        cost_class = controller.get_cost_class(request) if controller.enabled else None
+        if cost_class is None:
+            return self.get_response(request)
+
+        client = controller.get_client(request)
+        if not controller.clients.acquire(client):
+            return generate_json_response(
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "Too many concurrent requests from this client",
+                headers={'Retry-After': controller.retry_after}
+            )
+
+        try:
+            if not cost_class.acquire():
+                return generate_json_response(
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "The server is overloaded, please retry later",
+                    headers={'Retry-After': controller.retry_after}
+                )
+            try:
+                return self.get_response(request)
+            finally:
+                cost_class.release()
+        finally:
+            controller.clients.release(client)
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware as BaseAuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware as BaseMessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware as BaseSessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware as BaseXFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware as BaseCsrfViewMiddleware
+
+
+def get_skipped_prefixes(name):
+    """
+        Return the URL prefixes whose middleware profile leaves out the named middleware.
+    """
+    if not getattr(settings, 'MIDDLEWARE_PROFILES_ENABLED', False):
+        return ()
+    profiles = getattr(settings, 'MIDDLEWARE_PROFILES', {})
+    return tuple(prefix for prefix, skipped in profiles.items() if name in skipped)
+
+
+class ProfiledMiddlewareMixin:
+    """
+        Pass requests under the URL prefixes that do without this middleware straight to the next one,
+        without running any of its hooks.
+    """
+    profile_name = None
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.skipped_prefixes = get_skipped_prefixes(self.profile_name)
+
+    def is_skipped(self, request):
+        return bool(self.skipped_prefixes) and request.path_info.startswith(self.skipped_prefixes)
+
+    def __call__(self, request):
+        if self.is_skipped(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(ProfiledMiddlewareMixin, BaseSessionMiddleware):
+    profile_name = 'sessions'
+
+
+class CsrfViewMiddleware(ProfiledMiddlewareMixin, BaseCsrfViewMiddleware):
+    profile_name = 'csrf'
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if self.is_skipped(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(ProfiledMiddlewareMixin, BaseAuthenticationMiddleware):
+    profile_name = 'auth'
+
+
+class MessageMiddleware(ProfiledMiddlewareMixin, BaseMessageMiddleware):
+    profile_name = 'messages'
+
+
+class XFrameOptionsMiddleware(ProfiledMiddlewareMixin, BaseXFrameOptionsMiddleware):
+    profile_name = 'clickjacking'
@@ -0,0 +1,240 @@
+import cProfile
+import hmac
+import io
+import itertools
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+
+
+DEFAULT_SETTINGS = {
+    'ENABLED': False,
+    'TOKEN': None,
+    'HEADER': 'X-Profile',
+    'QUERY_PARAMETER': 'profile',
+    'SAMPLE_EVERY': 0,
+    'SAMPLE_INTERVAL_MS': 5,
+    'DIRECTORY': None,
+    'MAX_PROFILES': 50,
+}
+
+# Files written for each profile: the metadata, the cProfile statistics, their text report and the folded stacks
+PROFILE_FILES = {
+    'json': 'application/json',
+    'prof': 'application/octet-stream',
+    'txt': 'text/plain',
+    'folded': 'text/plain',
+}
+
+PROFILE_ID_RE = re.compile(r'^[0-9]{8}T[0-9]{6}-[0-9]{6}-[a-z0-9-]+$')
+
+
+def get_profiling_settings():
+    config = {**DEFAULT_SETTINGS, **getattr(settings, 'PROFILING', {})}
+    if config['DIRECTORY'] is None:
+        config['DIRECTORY'] = os.path.join(settings.BASE_DIR, 'profiles')
+    return config
+
+
+class StackSampler:
+    """
+        Samples the stack of one thread every `interval` seconds from a background thread,
+        counting the stacks in the folded format flame graph tools read ("outer;inner;leaf count").
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(f'{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def folded(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """
+        The profiles directory, keeping the MAX_PROFILES most recent profiles.
+    """
+
+    def __init__(self, directory, max_profiles):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def new_id(self, request):
+        slug = re.sub(r'[^a-z0-9]+', '-', f'{request.method} {request.path}'.lower()).strip('-')[:60]
+        return f"{timezone.now().strftime('%Y%m%dT%H%M%S-%f')}-{slug}"
+
+    def path(self, profile_id, kind):
+        if not PROFILE_ID_RE.match(profile_id) or kind not in PROFILE_FILES:
+            raise FileNotFoundError(profile_id)
+        return os.path.join(self.directory, f'{profile_id}.{kind}')
+
+    def save(self, profile_id, metadata, profiler, sampler):
+        os.makedirs(self.directory, exist_ok=True)
+
+        profiler.dump_stats(self.path(profile_id, 'prof'))
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).strip_dirs().sort_stats('cumulative').print_stats(60).print_callees(30)
+        with open(self.path(profile_id, 'txt'), 'w') as file:
+            file.write(report.getvalue())
+        if sampler is not None:
+            with open(self.path(profile_id, 'folded'), 'w') as file:
+                file.write(sampler.folded())
+        # The metadata is written last: a profile is listed once it is complete.
+        with open(self.path(profile_id, 'json'), 'w') as file:
+            json.dump({'id': profile_id, **metadata}, file)
+
+        self.prune()
+
+    def list(self):
+        """
+            Return the metadata of the stored profiles, newest first.
+        """
+        profiles = []
+        for name in sorted(os.listdir(self.directory) if os.path.isdir(self.directory) else [], reverse=True):
+            profile_id, _, kind = name.rpartition('.')
+            if kind != 'json' or not PROFILE_ID_RE.match(profile_id):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as file:
+                    metadata = json.load(file)
+            except (OSError, ValueError):
+                continue
+            metadata['files'] = [kind for kind in PROFILE_FILES if os.path.exists(self.path(profile_id, kind))]
+            profiles.append(metadata)
+        return profiles
+
+    def prune(self):
+        ids = sorted({name.rpartition('.')[0] for name in os.listdir(self.directory) if PROFILE_ID_RE.match(name.rpartition('.')[0])})
+        for profile_id in ids[:max(len(ids) - self.max_profiles, 0)]:
+            for kind in PROFILE_FILES:
+                try:
+                    os.remove(self.path(profile_id, kind))
+                except FileNotFoundError:
+                    pass
+
+
+def get_profile_store():
+    config = get_profiling_settings()
+    return ProfileStore(config['DIRECTORY'], config['MAX_PROFILES'])
+
+
+class ProfilingMiddleware:
+    """
+        Profile single requests on demand: the ones whose HEADER header or QUERY_PARAMETER parameter holds
+        the secret TOKEN, and one in SAMPLE_EVERY requests when sampling is on. Each profile is written to the
+        profiles directory, listed by /api/v1/metrics/profiles.
+
+        Removed from the stack when PROFILING['ENABLED'] is off; requests that are not profiled only pay
+        a header lookup and a counter increment. The requester is only authenticated by the view, after the
+        profile started, so the token is what keeps other clients from slowing their requests down under the
+        profiler and holding the profiling slot; without a TOKEN, only sampling profiles requests.
+        One request is profiled at a time per process; others arriving meanwhile run unprofiled.
+        Should come first, so the other middleware are profiled too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = get_profiling_settings()
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed()
+
+        self.token = config['TOKEN']
+        self.header = 'HTTP_' + config['HEADER'].upper().replace('-', '_')
+        self.parameter = config['QUERY_PARAMETER']
+        self.sample_every = config['SAMPLE_EVERY']
+        self.interval = config['SAMPLE_INTERVAL_MS'] / 1000
+        self.store = ProfileStore(config['DIRECTORY'], config['MAX_PROFILES'])
+        self.counter = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def has_token(self, value):
+        return value is not None and hmac.compare_digest(value.encode(), self.token.encode())
+
+    def get_trigger(self, request):
+        if self.token:
+            if self.header in request.META and self.has_token(request.META[self.header]):
+                return 'header'
+            if self.parameter + '=' in request.META.get('QUERY_STRING', '') and self.has_token(request.GET.get(self.parameter)):
+                return 'query'
+        if self.sample_every and next(self.counter) % self.sample_every == 0:
+            return 'sample'
+        return None
+
+    def __call__(self, request):
+        trigger = self.get_trigger(request)
+        if trigger is None or not self.lock.acquire(blocking=False):
+            return self.get_response(request)
+
+        try:
+            return self.profile(request, trigger)
+        finally:
+            self.lock.release()
+
+    def profile(self, request, trigger):
+        profile_id = self.store.new_id(request)
+        sampler = StackSampler(threading.get_ident(), self.interval) if self.interval else None
+        profiler = cProfile.Profile()
+
+        started = time.perf_counter()
+        if sampler is not None:
+            sampler.start()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+            if sampler is not None:
+                sampler.stop()
+        duration = time.perf_counter() - started
+
+        user = getattr(request, 'user', None)
+        query = request.META.get('QUERY_STRING', '')
+        if self.token:
+            # Profiles are listed to every admin: the token is not stored with them.
+            query = query.replace(self.token, '***')
+        try:
+            self.store.save(profile_id, {
+                'created_at': timezone.now().isoformat(),
+                'method': request.method,
+                'path': request.path,
+                'query': query,
+                'status_code': response.status_code,
+                'duration_ms': round(duration * 1000, 2),
+                'trigger': trigger,
+                'user': user.get_username() if user is not None and user.is_authenticated else None,
+            }, profiler, sampler)
+            response['X-Profile-Id'] = profile_id
+        except OSError:
+            # A full or read-only disk must not fail the request being profiled.
+            pass
+
+        return response
@@ -1,4 +1,5 @@
 from rest_framework.response import Response
+from django.http import JsonResponse
 from datetime import datetime
 
 
@@ -13,3 +14,16 @@ def generate_response(status_code, message, data=None):
         'timestamp': datetime.now(),
         'data': data
     }, status=status_code)
+
+
+def generate_json_response(status_code, message, data=None, headers=None):
+    """
+        Same response envelope as generate_response, for code running outside of DRF views (middleware, plain Django views).
+    """
+
+    return JsonResponse({
+        'status_code': status_code,
+        'message': message,
+        'timestamp': datetime.now(),
+        'data': data
+    }, status=status_code, headers=headers)
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from drf_spectacular.renderers import OpenApiJsonRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+
+
+def generate_schema():
+    """
+        Introspect every view and serializer into the OpenAPI schema, as the `spectacular` command does.
+    """
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def render_schema_file(schema):
+    """
+        Render a schema the way it is stored in OPENAPI_SCHEMA_FILE.
+    """
+    return OpenApiJsonRenderer().render(schema, renderer_context={})
+
+
+class SchemaCache:
+    """
+        The schema of this process, loaded from OPENAPI_SCHEMA_FILE when it exists or else generated once,
+        and its renderings per media type, each with a strong ETag.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._schema = None
+        self._rendered = {}
+
+    def get_schema(self):
+        with self._lock:
+            if self._schema is None:
+                path = getattr(settings, 'OPENAPI_SCHEMA_FILE', None)
+                if path and path.exists():
+                    self._schema = json.loads(path.read_bytes())
+                else:
+                    self._schema = generate_schema()
+            return self._schema
+
+    def get_rendered(self, renderer):
+        """
+            Return the (content, etag) of the schema rendered by a renderer, rendering it on first use.
+        """
+        rendered = self._rendered.get(renderer.media_type)
+        if rendered is None:
+            content = renderer.render(self.get_schema(), renderer.media_type, {})
+            rendered = content, '"%s"' % hashlib.sha256(content).hexdigest()
+            self._rendered[renderer.media_type] = rendered
+        return rendered
+
+    def clear(self):
+        with self._lock:
+            self._schema = None
+            self._rendered = {}
+
+
+schema_cache = SchemaCache()
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+        Serve the OpenAPI schema without introspecting the code on every request.
+        When OPENAPI_SCHEMA_CACHED is off, falls back to generating it per request.
+    """
+
+    def _get_schema_response(self, request):
+        if not getattr(settings, 'OPENAPI_SCHEMA_CACHED', True):
+            return super()._get_schema_response(request)
+
+        content, etag = schema_cache.get_rendered(request.accepted_renderer)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            return HttpResponseNotModified(headers=headers)
+
+        return HttpResponse(content, content_type=request.accepted_renderer.media_type, headers={
+            **headers,
+            'Content-Disposition': f'inline; filename="{self._get_filename(request, None)}"',
+        })
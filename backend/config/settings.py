@@ -18,6 +18,8 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    # Registers the OpClass index expressions (prefix search indexes) and PostgreSQL lookups
+    'django.contrib.postgres',
 
     'rest_framework',
 
@@ -41,20 +43,32 @@ REST_FRAMEWORK = {
     'DEFAULT_PARSER_CLASSES': (
         'rest_framework.parsers.JSONParser',
     ),
-    
+    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
 
 MIDDLEWARE = [
+    'config.profiling.ProfilingMiddleware',
+    'config.slowqueries.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'config.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'config.middleware.CsrfViewMiddleware',
+    'config.middleware.AuthenticationMiddleware',
+    'config.admission.AdmissionControlMiddleware',
+    'config.middleware.MessageMiddleware',
+    'config.middleware.XFrameOptionsMiddleware',
 ]
 
+# Middleware left out for the requests under each URL prefix (see config/middleware.py).
+# The JSON API authenticates with HTTP Basic and renders no HTML, so it needs neither sessions, CSRF,
+# session authentication, messages nor frame options; the admin and the docs keep the full stack.
+# Off in development, so the browsable docs can still call the API with the admin session.
+MIDDLEWARE_PROFILES_ENABLED = not DEBUG
+MIDDLEWARE_PROFILES = {
+    '/api/': ['sessions', 'csrf', 'auth', 'messages', 'clickjacking'],
+}
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -108,6 +122,146 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# The first hasher hashes new passwords, the others only verify existing hashes.
+# Put TunedArgon2PasswordHasher first (requires `argon2-cffi`) to switch new passwords to Argon2.
+
+PASSWORD_HASHERS = [
+    'apps.users.hashers.TunedPBKDF2PasswordHasher',
+    'apps.users.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+AUTH_HASHING_SETTINGS = {
+    # Threads verifying and hashing passwords, and the number of operations allowed in flight
+    # before logins and registrations are rejected with 503.
+    'WORKERS': 2,
+    'QUEUE_SIZE': 32,
+
+    # Work factors
+    'PBKDF2_ITERATIONS': 870000,
+    'ARGON2_TIME_COST': 2,
+    'ARGON2_MEMORY_COST': 65536,
+    'ARGON2_PARALLELISM': 1,
+}
+
+# Number of processes hashing passwords in the import_users command (None uses every CPU core)
+USER_IMPORT_WORKERS = None
+# Largest list of users POST /api/v1/users/import accepts (413 above); its passwords are hashed in the request thread
+USER_IMPORT_MAX_ROWS = 100
+
+# Number of posts purged per transaction by the background deletion runner (run_deletion_jobs)
+DELETION_JOB_BATCH_SIZE = 500
+
+# Age (seconds) a post change must reach before the change feed returns it, so late commits are not skipped
+SYNC_SETTLE_SECONDS = 2
+
+# Related posts computed by build_related_posts: number kept per post, and weights of a shared tag and category
+RELATED_POSTS = {
+    'COUNT': 10,
+    'TAG_WEIGHT': 1.0,
+    'CATEGORY_WEIGHT': 0.5,
+    # Posts whose similarities are computed at once (memory grows with it)
+    'BATCH_SIZE': 1000,
+}
+
+# Optional monthly range partitioning of posts by created_at on PostgreSQL (see `manage.py partition_posts`):
+# `maintain` keeps MONTHS_AHEAD months of partitions ahead (inserts past the last one fail, so schedule it)
+# and detaches the partitions older than DETACH_AFTER_MONTHS months (None keeps every partition attached)
+POSTS_PARTITIONING = {
+    'MONTHS_AHEAD': 3,
+    'DETACH_AFTER_MONTHS': None,
+}
+
+# Seconds an exact post count is reused by later pages of the same list (writes to posts drop it sooner)
+POST_COUNT_CACHE_TIMEOUT = 30
+# Table size above which the unfiltered post list reports the PostgreSQL planner estimate instead of counting
+POST_COUNT_ESTIMATE_THRESHOLD = 100000
+
+# Post search results: ordered ids cached per term and window of WINDOW_SIZE results for TIMEOUT seconds;
+# writes to posts, tags or author names make every cached result stale (see apps/blog/search.py)
+SEARCH_CACHE = {
+    'ENABLED': True,
+    'TIMEOUT': 300,
+    'WINDOW_SIZE': 100,
+}
+# Seconds title suggestions are cached, short enough that new and renamed posts show up while typing
+TITLE_SUGGEST_CACHE_TIMEOUT = 30
+
+# Seconds author statistics stay cached (writes to the author's posts drop them sooner), and tags and categories listed
+AUTHOR_STATS_CACHE_TIMEOUT = 600
+AUTHOR_STATS_TOP = 10
+
+# Seconds post views are buffered in each process before being written to the hourly view counts
+POST_VIEWS_FLUSH_SECONDS = 30
+# Posts kept in each popular posts ranking, and seconds a ranking is cached when no view refreshes it
+POST_VIEWS_RANKING_SIZE = 100
+POST_VIEWS_RANKING_TIMEOUT = 300
+
+ADMISSION_CONTROL = {
+    'ENABLED': True,
+
+    # Requests a single session user (or IP address otherwise, Basic clients included) may have in flight; more are rejected with 429
+    'PER_CLIENT_CONCURRENCY': 8,
+    'RETRY_AFTER_SECONDS': 1,
+    # Identify anonymous clients by the first X-Forwarded-For address; only behind a proxy that sets it
+    'TRUST_X_FORWARDED_FOR': False,
+
+    # Concurrent requests per cost class and process, and how long (ms) a request may wait
+    # for a slot before it is shed with 503
+    'COST_CLASSES': {
+        'expensive': {'CONCURRENCY': 4, 'MAX_QUEUE_MS': 250},
+        'default': {'CONCURRENCY': 64, 'MAX_QUEUE_MS': 2000},
+    },
+    # (method or '*', path regex, cost class); routes not listed fall in 'default'
+    'ROUTES': [
+        ('GET', r'^/api/v1/posts$', 'expensive'),
+        ('GET', r'^/api/v1/posts/search$', 'expensive'),
+        ('GET', r'^/api/v1/users$', 'expensive'),
+        ('GET', r'^/api/v1/users/export$', 'expensive'),
+        ('POST', r'^/api/v1/users/import$', 'expensive'),
+    ],
+    # Paths never queued nor counted: long-lived streams, the admin and the metrics themselves
+    'EXEMPT': [
+        r'^/api/v1/posts/events$',
+        r'^/api/v1/metrics/',
+        r'^/admin/',
+    ],
+}
+
+# Recording of the statements slower than THRESHOLD_MS (see config/slowqueries.py), served by /api/v1/metrics/slow-queries.
+# Off by default: statements under the threshold cost two clock reads, slower ones a stack walk and an EXPLAIN.
+SLOW_QUERIES = {
+    'ENABLED': False,
+    'THRESHOLD_MS': 200,
+    # Statements kept per process, the oldest are dropped first
+    'MAX_ENTRIES': 200,
+    # Attach the plan of SELECT statements (EXPLAIN, without running them again)
+    'EXPLAIN': True,
+    # Project frames kept from the stack of each statement
+    'STACK_DEPTH': 5,
+}
+
+
+# On-demand profiling of single requests (see config/profiling.py), listed by /api/v1/metrics/profiles.
+# Off by default; when on, requests that are not profiled pay a header lookup and a counter increment.
+PROFILING = {
+    'ENABLED': False,
+    # Profile a request sent with this secret in the HEADER header (or the QUERY_PARAMETER parameter);
+    # None leaves only sampling, so no client can force its requests under the profiler
+    'TOKEN': None,
+    'HEADER': 'X-Profile',
+    'QUERY_PARAMETER': 'profile',
+    # Also profile one request in N, whoever sends it (0 turns sampling off)
+    'SAMPLE_EVERY': 0,
+    # Interval of the stack samples written as folded stacks for flame graphs (0 keeps cProfile only)
+    'SAMPLE_INTERVAL_MS': 5,
+    # Where profiles are written; the oldest are deleted past MAX_PROFILES
+    'DIRECTORY': BASE_DIR / 'profiles',
+    'MAX_PROFILES': 50,
+}
+
 
 # Internationalization
 
@@ -130,9 +284,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 # OpenAPI Swagger
-REST_FRAMEWORK = {
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-}
+# Serve /schema/ from OPENAPI_SCHEMA_FILE (written by `manage.py generate_schema`), or when the file is missing
+# generate it once per process; turn off to regenerate it on every request while editing views
+OPENAPI_SCHEMA_CACHED = True
+OPENAPI_SCHEMA_FILE = BASE_DIR / 'openapi.json'
 
 SPECTACULAR_SETTINGS = {
     'TITLE': 'API Blog Post : BlogPuilsem',
@@ -0,0 +1,213 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+
+DEFAULT_SETTINGS = {
+    'ENABLED': False,
+    'THRESHOLD_MS': 200,
+    'MAX_ENTRIES': 200,
+    'EXPLAIN': True,
+    'STACK_DEPTH': 5,
+}
+
+
+def get_slow_query_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'SLOW_QUERIES', {})}
+
+
+PLACEHOLDER_LIST_RE = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'(?<![\w."])-?\d+(?:\.\d+)?\b')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """
+        Reduce a statement to its shape, so the same query with other values or IN list lengths reads the same:
+        placeholders and literals become ?, and IN lists become (...).
+    """
+    sql = PLACEHOLDER_LIST_RE.sub('(...)', sql)
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    return WHITESPACE_RE.sub(' ', sql.replace('%s', '?')).strip()
+
+
+def project_stack(depth):
+    """
+        Return the innermost frames of the calling stack that belong to the project, as "path:line in function",
+        leaving out Django, third-party packages and this module.
+    """
+    root = str(settings.BASE_DIR) + os.sep
+    frames = []
+    frame = sys._getframe(1)
+
+    while frame is not None and len(frames) < depth:
+        filename = frame.f_code.co_filename
+        if filename.startswith(root) and filename != __file__ and 'site-packages' not in filename:
+            frames.append(f'{os.path.relpath(filename, root)}:{frame.f_lineno} in {frame.f_code.co_name}')
+        frame = frame.f_back
+
+    return frames
+
+
+def explain(connection, sql, params):
+    """
+        Return the plan the database picks for a statement, without running it, or None when it cannot be explained.
+        Runs on a cursor outside the execute wrappers, inside a savepoint when a transaction is open,
+        so a failing EXPLAIN does not abort the transaction of the request.
+    """
+    if not sql.lstrip()[:6].upper().startswith(('SELECT', 'WITH')):
+        return None
+
+    cursor = connection.create_cursor()
+    savepoint = connection.in_atomic_block
+    try:
+        if savepoint:
+            cursor.execute('SAVEPOINT slow_query_explain')
+        try:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            plan = '\n'.join(str(row[-1]) for row in cursor.fetchall())
+        except Exception:
+            if savepoint:
+                cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            plan = None
+        if savepoint:
+            cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+        return plan
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    """
+        The last MAX_ENTRIES statements of this process that ran longer than THRESHOLD_MS, newest last.
+    """
+
+    def __init__(self, config):
+        self.enabled = config['ENABLED']
+        self.threshold = config['THRESHOLD_MS'] / 1000
+        self.explain = config['EXPLAIN']
+        self.stack_depth = config['STACK_DEPTH']
+        self.lock = threading.Lock()
+        self.entries = deque(maxlen=config['MAX_ENTRIES'])
+        self.recorded = 0
+
+    def record(self, request, connection, sql, params, many, duration, failed=False):
+        stack = project_stack(self.stack_depth)
+        match = getattr(request, 'resolver_match', None)
+
+        entry = {
+            'recorded_at': timezone.now().isoformat(),
+            'duration_ms': round(duration * 1000, 2),
+            'sql': normalize_sql(sql),
+            'database': connection.alias,
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'call_site': stack[0] if stack else None,
+            'stack': stack,
+            'failed': failed,
+            'plan': explain(connection, sql, params) if self.explain and not many and not failed else None,
+        }
+
+        with self.lock:
+            self.entries.append(entry)
+            self.recorded += 1
+
+    def snapshot(self, limit=None):
+        """
+            Return the recorded statements, newest first.
+        """
+        with self.lock:
+            entries = list(reversed(self.entries))
+            recorded = self.recorded
+
+        return {
+            'enabled': self.enabled,
+            'threshold_ms': self.threshold * 1000,
+            'recorded': recorded,
+            'entries': entries[:limit],
+        }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class QueryTimer:
+    """
+        Execute wrapper timing every statement of a request; only the ones over the threshold cost more than
+        two clock reads.
+    """
+
+    def __init__(self, log, request):
+        self.log = log
+        self.request = request
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = execute(sql, params, many, context)
+            failed = False
+            return result
+        finally:
+            duration = time.perf_counter() - started
+            if duration >= self.log.threshold:
+                # A failed statement may have aborted the transaction, it is recorded without a plan.
+                self.log.record(self.request, context['connection'], sql, params, many, duration, failed)
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def get_slow_query_log():
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = SlowQueryLog(get_slow_query_settings())
+    return _log
+
+
+def reset_slow_query_log(**overrides):
+    """
+        Replace the log of this process with an empty one, built from SLOW_QUERIES with the given keys overridden.
+        Middleware already built keep recording into the previous log.
+    """
+    global _log
+    with _log_lock:
+        _log = SlowQueryLog({**get_slow_query_settings(), **overrides})
+    return _log
+
+
+class SlowQueryMiddleware:
+    """
+        Record the slow statements run while serving a request, with the view and the project code that issued them.
+        Removed from the stack when SLOW_QUERIES['ENABLED'] is off. Should come first, so the queries
+        of the other middleware (sessions, authentication) are timed too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.log = get_slow_query_log()
+        if not self.log.enabled:
+            raise MiddlewareNotUsed()
+
+    def __call__(self, request):
+        timer = QueryTimer(self.log, request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            return self.get_response(request)
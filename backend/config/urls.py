@@ -1,12 +1,20 @@
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from drf_spectacular.views import SpectacularSwaggerView
 from django.urls import path, include
 from django.contrib import admin
+
+from config.schema import CachedSchemaView
+from config.views import AdmissionMetricsView, SearchCacheMetricsView, SlowQueriesView, ProfileListView, ProfileFileView
 from django.urls import path
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('schema/', CachedSchemaView.as_view(), name='schema'),
     path('docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('api/v1/metrics/admission', AdmissionMetricsView.as_view(), name='admission-metrics'),
+    path('api/v1/metrics/search-cache', SearchCacheMetricsView.as_view(), name='search-cache-metrics'),
+    path('api/v1/metrics/slow-queries', SlowQueriesView.as_view(), name='slow-queries'),
+    path('api/v1/metrics/profiles', ProfileListView.as_view(), name='profile-list'),
+    path('api/v1/metrics/profiles/<str:profile_id>.<str:kind>', ProfileFileView.as_view(), name='profile-file'),
     path('api/v1/', include('apps.users.urls')),
     path('api/', include('apps.blog.urls')),
 ]
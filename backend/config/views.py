@@ -0,0 +1,144 @@
+from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParameter
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+from rest_framework import status
+from django.http import FileResponse
+
+from config.admission import get_controller
+from config.slowqueries import get_slow_query_log
+from config.profiling import PROFILE_FILES, get_profile_store
+from apps.blog import search
+from config.response import generate_response
+
+
+class AdmissionMetricsView(APIView):
+    """
+        Report the admission control counters of the process serving the request.
+    """
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        tags=["Monitoring"],
+        summary="Admission control metrics",
+        description="In-flight, waiting, admitted and shed requests and queue times per cost class, "
+                    "and per-client concurrency rejections, for the process serving the request. Admin only.",
+        responses={
+            200: OpenApiResponse(description='Admission control metrics'),
+            403: OpenApiResponse(description='Forbidden: Admin access required'),
+        }
+    )
+    def get(self, request):
+        return generate_response(status.HTTP_200_OK, "Admission control metrics", get_controller().metrics())
+
+
+class SearchCacheMetricsView(APIView):
+    """
+        Report the search cache counters of the process serving the request.
+    """
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        tags=["Monitoring"],
+        summary="Search cache metrics",
+        description="Hits, misses and hit ratio of the post search cache, and the number and size (pickled bytes) "
+                    "of the entries this process cached that are still current, for the process serving the request. Admin only.",
+        responses={
+            200: OpenApiResponse(description='Search cache metrics'),
+            403: OpenApiResponse(description='Forbidden: Admin access required'),
+        }
+    )
+    def get(self, request):
+        return generate_response(status.HTTP_200_OK, "Search cache metrics", search.stats.snapshot())
+
+
+class SlowQueriesView(APIView):
+    """
+        Report the slow statements recorded by the process serving the request.
+    """
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        tags=["Monitoring"],
+        summary="Slow queries",
+        description="The last statements that ran longer than SLOW_QUERIES['THRESHOLD_MS'] in the process serving the request, "
+                    "newest first, with their normalized SQL, duration, view, call site and plan. "
+                    "Empty unless SLOW_QUERIES['ENABLED'] is on. Admin only.",
+        responses={
+            200: OpenApiResponse(description='Slow queries'),
+            400: OpenApiResponse(description='Invalid limit'),
+            403: OpenApiResponse(description='Forbidden: Admin access required'),
+        },
+        parameters=[
+            OpenApiParameter(name='limit', type=int, description="Maximum number of statements returned (default is all)"),
+        ]
+    )
+    def get(self, request):
+        try:
+            limit = int(request.query_params['limit']) if 'limit' in request.query_params else None
+        except ValueError:
+            return generate_response(status.HTTP_400_BAD_REQUEST, "limit must be an integer", None)
+
+        return generate_response(status.HTTP_200_OK, "Slow queries", get_slow_query_log().snapshot(limit))
+
+    @extend_schema(
+        tags=["Monitoring"],
+        summary="Clear slow queries",
+        description="Forget the slow statements recorded by the process serving the request. Admin only.",
+        responses={
+            204: OpenApiResponse(description='Slow queries cleared'),
+            403: OpenApiResponse(description='Forbidden: Admin access required'),
+        }
+    )
+    def delete(self, request):
+        get_slow_query_log().clear()
+        return generate_response(status.HTTP_204_NO_CONTENT, "Slow queries cleared", None)
+
+
+class ProfileListView(APIView):
+    """
+        List the request profiles stored by the process serving the request's host.
+    """
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        tags=["Monitoring"],
+        summary="Request profiles",
+        description="The stored request profiles, newest first, with the request, its duration, what triggered it "
+                    "and the files available. Profile a request by sending PROFILING['TOKEN'] in the X-Profile header "
+                    "or the profile query parameter, while PROFILING['ENABLED'] is on. Admin only.",
+        responses={
+            200: OpenApiResponse(description='Request profiles'),
+            403: OpenApiResponse(description='Forbidden: Admin access required'),
+        }
+    )
+    def get(self, request):
+        return generate_response(status.HTTP_200_OK, "Request profiles", get_profile_store().list())
+
+
+class ProfileFileView(APIView):
+    """
+        Download a file of a request profile.
+    """
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        tags=["Monitoring"],
+        summary="Download a request profile",
+        description="Download a file of a profile: `prof` (cProfile statistics, for snakeviz or pstats), `txt` (their text report), "
+                    "`folded` (sampled stacks, for flamegraph.pl or speedscope) or `json` (the request metadata). Admin only.",
+        responses={
+            200: OpenApiResponse(description='Profile file'),
+            403: OpenApiResponse(description='Forbidden: Admin access required'),
+            404: OpenApiResponse(description='Profile file not found'),
+        }
+    )
+    def get(self, request, profile_id, kind):
+        try:
+            return FileResponse(
+                open(get_profile_store().path(profile_id, kind), 'rb'),
+                as_attachment=True,
+                filename=f'{profile_id}.{kind}',
+                content_type=PROFILE_FILES[kind]
+            )
+        except FileNotFoundError:
+            return generate_response(status.HTTP_404_NOT_FOUND, "Profile file not found", None)